@@ -1,8 +1,17 @@
 from backend.db import get_connection
-from typing import List, Optional, Tuple
-import sqlite3
+from typing import FrozenSet, List, Optional, Tuple
 
-DB_PATH = "database/budget_tracker.db"
+# Categories change rarely at runtime; lookups are memoized here and every
+# write in this module clears them via _invalidate_category_cache().
+_CAT_ID_CACHE: dict[str, int] = {}
+_CAT_FULL_CACHE: Optional[Tuple[Tuple, ...]] = None
+_CAT_TYPE_IDS_CACHE: dict[int, FrozenSet[int]] = {}
+
+def _invalidate_category_cache() -> None:
+    global _CAT_FULL_CACHE
+    _CAT_ID_CACHE.clear()
+    _CAT_TYPE_IDS_CACHE.clear()
+    _CAT_FULL_CACHE = None
 
 def add_category(name: str, limit_amount: Optional[float] = None, category_type: int = 0, currency: str = "EUR") -> None:
     with get_connection() as conn:
@@ -15,40 +24,35 @@ def add_category(name: str, limit_amount: Optional[float] = None, category_type:
             (name, limit_amount, category_type, currency)
         )
         conn.commit()
+    _invalidate_category_cache()
 
 def edit_category(category_id: int, new_name: Optional[str] = None, new_limit_amount: Optional[float] = None, new_type: Optional[int] = None, new_currency: Optional[str] = None) -> None:
+    # None keeps the current value (COALESCE falls back to the column)
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT name, limit_amount, type, currency FROM category WHERE id = ?', (category_id,))
-        row = cursor.fetchone()
-        if not row:
-            return  # silently exit if category not found
-
-        current_name, current_limit_amount, current_type, current_currency = row
-
-        name = new_name if new_name is not None else current_name
-        limit_amount = new_limit_amount if new_limit_amount is not None else current_limit_amount
-        category_type = new_type if new_type is not None else current_type
-        currency = new_currency if new_currency is not None else current_currency
-
         cursor.execute(
             '''
             UPDATE category
-            SET name = ?, limit_amount = ?, type = ?, currency = ?
+            SET name = COALESCE(?, name),
+                limit_amount = COALESCE(?, limit_amount),
+                type = COALESCE(?, type),
+                currency = COALESCE(?, currency)
             WHERE id = ?
             ''',
-            (name, limit_amount, category_type, currency, category_id)
+            (new_name, new_limit_amount, new_type, new_currency, category_id)
         )
         conn.commit()
+    _invalidate_category_cache()
 
-def remove_category(category_id: int) -> None:
+def remove_category(category_id: int) -> int:
+    # Missing ids are a no-op; the return value is the number of rows deleted
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT id FROM category WHERE id = ?', (category_id,))
-        if not cursor.fetchone():
-            return  # silently exit if it doesn't exist
         cursor.execute('DELETE FROM category WHERE id = ?', (category_id,))
         conn.commit()
+    if cursor.rowcount:
+        _invalidate_category_cache()
+    return cursor.rowcount
 
 def get_category_by_id(category_id: int) -> Optional[Tuple]:
     with get_connection() as conn:
@@ -57,27 +61,39 @@ def get_category_by_id(category_id: int) -> Optional[Tuple]:
         return cursor.fetchone()
 
 def get_all_categories():
-    with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, name, limit_amount, type, currency FROM category')
-        return cursor.fetchall()
+    # Same rows as get_all_categories_full; hand out a list copy of the cache
+    return list(get_all_categories_full())
 
 def get_category_id_by_name(category_name: str) -> Optional[int]:
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM category WHERE name = ?", (category_name,))
-    result = cursor.fetchone()
-    conn.close()
+    cached = _CAT_ID_CACHE.get(category_name)
+    if cached is not None:
+        return cached
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM category WHERE name = ?", (category_name,))
+        result = cursor.fetchone()
     if result:
+        _CAT_ID_CACHE[category_name] = result[0]
         return result[0]
     else:
         return None
 
 def get_all_categories_full():
-    with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, name, limit_amount, type, currency FROM category')
-        return cursor.fetchall()
+    global _CAT_FULL_CACHE
+    if _CAT_FULL_CACHE is None:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, name, limit_amount, type, currency FROM category')
+            _CAT_FULL_CACHE = tuple(cursor.fetchall())
+    return _CAT_FULL_CACHE
+
+def get_category_ids_by_type(category_type: int) -> FrozenSet[int]:
+    # 0 = variable, 1 = fixed
+    ids = _CAT_TYPE_IDS_CACHE.get(category_type)
+    if ids is None:
+        ids = frozenset(cat[0] for cat in get_all_categories_full() if cat[3] == category_type)
+        _CAT_TYPE_IDS_CACHE[category_type] = ids
+    return ids
     
 def add_categories():
     categories_to_add = [
@@ -100,9 +116,14 @@ def add_categories():
         ("Groceries", 150.0, 0, "EUR")  
     ]
 
-    for name, budget, is_fixed, currency in categories_to_add:
-        try:
-            add_category(name, budget, is_fixed, currency)
-        except Exception:
-            # silently ignore duplicates or errors (no prints)
-            pass
+    # Single transaction; OR IGNORE skips names that already exist
+    with get_connection() as conn:
+        conn.executemany(
+            '''
+            INSERT OR IGNORE INTO category (name, limit_amount, type, currency)
+            VALUES (?, ?, ?, ?)
+            ''',
+            categories_to_add
+        )
+        conn.commit()
+    _invalidate_category_cache()
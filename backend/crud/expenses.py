@@ -1,54 +1,59 @@
-from backend.db import get_connection
-from typing import List, Optional, Tuple
 import sqlite3
 
-DB_PATH = "database/budget_tracker.db"
+from backend.db import get_connection
+from typing import Iterable, List, Optional, Tuple
+
+def add_expense(name: str, cost: float, date_str: str, category_id: Optional[int] = None, wallet_id: Optional[int] = None, description: Optional[str] = None, conn: Optional[sqlite3.Connection] = None) -> None:
+    add_expenses_bulk([(name, cost, date_str, category_id, wallet_id, description)], conn=conn)
 
-def add_expense(name: str, cost: float, date_str: str, category_id: Optional[int] = None, wallet_id: Optional[int] = None, description: Optional[str] = None) -> None:
+def add_expenses_bulk(rows: Iterable[Tuple], conn: Optional[sqlite3.Connection] = None) -> None:
+    '''
+    Inserts many expenses in one transaction.
+    Each row is (name, cost, date_str, category_id, wallet_id, description),
+    the same order as add_expense's parameters.
+    When `conn` is given the insert joins the caller's transaction and the
+    caller commits.
+    '''
+    sql = '''
+        INSERT INTO expense (name, cost, date, category_id, wallet_id, description)
+        VALUES (?, ?, ?, ?, ?, ?)
+    '''
+    if conn is not None:
+        conn.executemany(sql, rows)
+        return
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute(
-            '''
-            INSERT INTO expense (name, category_id, cost, date, description, wallet_id)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ''',
-            (name, category_id, cost, date_str, description, wallet_id)
-        )
+        cursor.executemany(sql, rows)
         conn.commit()
 
 def edit_expense(expense_id: int, new_name: Optional[str] = None, new_category_id: Optional[int] = None, new_cost: Optional[float] = None, new_date_str: Optional[str] = None, new_description: Optional[str] = None, new_wallet_id: Optional[int] = None) -> None:
+    # None keeps the current value (COALESCE falls back to the column)
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT name, category_id, cost, date, description, wallet_id FROM expense WHERE id = ?', (expense_id,))
-        row = cursor.fetchone()
-        if not row:
-            print("Expense not found.")
-            return
-
-        current_name, current_category_id, current_cost, current_date, current_description, current_wallet_id = row
-
-        name = new_name if new_name is not None else current_name
-        category_id = new_category_id if new_category_id is not None else current_category_id
-        cost = new_cost if new_cost is not None else current_cost
-        date_str = new_date_str if new_date_str is not None else current_date
-        description = new_description if new_description is not None else current_description
-        wallet_id = new_wallet_id if new_wallet_id is not None else current_wallet_id
-
         cursor.execute(
             '''
             UPDATE expense
-            SET name = ?, category_id = ?, cost = ?, date = ?, description = ?, wallet_id = ?
+            SET name = COALESCE(?, name),
+                category_id = COALESCE(?, category_id),
+                cost = COALESCE(?, cost),
+                date = COALESCE(?, date),
+                description = COALESCE(?, description),
+                wallet_id = COALESCE(?, wallet_id)
             WHERE id = ?
             ''',
-            (name, category_id, cost, date_str, description, wallet_id, expense_id)
+            (new_name, new_category_id, new_cost, new_date_str, new_description, new_wallet_id, expense_id)
         )
+        if cursor.rowcount == 0:
+            print("Expense not found.")
+            return
         conn.commit()
 
-def remove_expense(expense_id: int) -> None:
+def remove_expense(expense_id: int) -> int:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('DELETE FROM expense WHERE id = ?', (expense_id,))
         conn.commit()
+        return cursor.rowcount
 
 def get_expense_by_id(expense_id: int) -> Optional[Tuple]:
     with get_connection() as conn:
@@ -59,19 +64,17 @@ def get_expense_by_id(expense_id: int) -> Optional[Tuple]:
 def get_expenses_by_category(category_id: int) -> List[int]:
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT id FROM expense WHERE category_id = ?', (category_id,))
-        return [row[0] for row in cursor.fetchall()]
+        return [row[0] for row in cursor.execute('SELECT id FROM expense WHERE category_id = ?', (category_id,))]
 
 def get_expenses_by_date_range(start_date: str, end_date: str) -> List[int]:
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT id FROM expense WHERE date BETWEEN ? AND ?', (start_date, end_date))
-        return [row[0] for row in cursor.fetchall()]
+        return [row[0] for row in cursor.execute('SELECT id FROM expense WHERE date BETWEEN ? AND ?', (start_date, end_date))]
 
 def get_all_expenses_ordered_by_id() -> List[Tuple]:
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM expense ORDER BY id ASC')
+        cursor.execute('SELECT id, name, category_id, cost, date, description, wallet_id FROM expense ORDER BY id ASC')
         return cursor.fetchall()
 
 def get_all_expenses() -> List[Tuple]:
@@ -86,6 +89,23 @@ def get_all_expenses4display() -> List[Tuple]:
         cursor.execute('SELECT id, name, cost, date FROM expense')
         return cursor.fetchall()
 
+_ORDER_BY_BASE = '''
+    SELECT expense.id, expense.name, category.name AS category, cost, date, description, wallet_id
+    FROM expense
+    LEFT JOIN category ON expense.category_id = category.id
+    ORDER BY '''
+
+_ORDER_BY_SUFFIX = {
+    1: "expense.id ASC",
+    2: "category.name ASC",
+    3: "cost DESC",
+    4: "cost ASC",
+    5: "date DESC",
+}
+
+# Built once so repeated calls reuse the connection's compiled statement
+_ORDER_BY_QUERIES = {k: _ORDER_BY_BASE + v for k, v in _ORDER_BY_SUFFIX.items()}
+
 def ordeBy(option: int = 1) -> List[Tuple]:
     '''
     Orders expenses in the database by the selected option.
@@ -101,48 +121,13 @@ def ordeBy(option: int = 1) -> List[Tuple]:
     Returns:
         List of ordered expense tuples.
     '''
-    query_map = {
-        1: '''
-            SELECT expense.id, expense.name, category.name AS category, cost, date, description, wallet_id
-            FROM expense
-            LEFT JOIN category ON expense.category_id = category.id
-            ORDER BY expense.id ASC
-        ''',
-        2: '''
-            SELECT expense.id, expense.name, category.name AS category, cost, date, description, wallet_id
-            FROM expense
-            LEFT JOIN category ON expense.category_id = category.id
-            ORDER BY category.name ASC
-        ''',
-        3: '''
-            SELECT expense.id, expense.name, category.name AS category, cost, date, description, wallet_id
-            FROM expense
-            LEFT JOIN category ON expense.category_id = category.id
-            ORDER BY cost DESC
-        ''',
-        4: '''
-            SELECT expense.id, expense.name, category.name AS category, cost, date, description, wallet_id
-            FROM expense
-            LEFT JOIN category ON expense.category_id = category.id
-            ORDER BY cost ASC
-        ''',
-        5: '''
-            SELECT expense.id, expense.name, category.name AS category, cost, date, description, wallet_id
-            FROM expense
-            LEFT JOIN category ON expense.category_id = category.id
-            ORDER BY date DESC
-        '''
-    }
-
-    if option not in query_map:
+    query = _ORDER_BY_QUERIES.get(option)
+    if query is None:
         raise ValueError("Invalid option. Choose between 1 and 5.")
 
-    query = query_map[option]
-
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(query)
         expenses = cursor.fetchall()
 
     return expenses
-
@@ -1,18 +1,22 @@
 from backend.db import get_connection
-from typing import List, Optional, Tuple
-import sqlite3
-
-DB_PATH = "database/budget_tracker.db"
+from typing import Iterable, List, Optional, Tuple
 
 def add_goal(name: str, amount_to_reach: float, amount_reached: float = 0.0, category_id: Optional[int] = None, currency: str = "EUR", start_date: Optional[str] = None) -> None:
+    add_goals_bulk([(name, amount_to_reach, amount_reached, category_id, currency, start_date)])
+
+def add_goals_bulk(rows: Iterable[Tuple]) -> None:
+    '''
+    Inserts many goals in one transaction.
+    Each row is (name, amount_to_reach, amount_reached, category_id, currency, start_date).
+    '''
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute(
+        cursor.executemany(
             '''
             INSERT INTO goal (name, amount_to_reach, amount_reached, category_id, currency, start_date)
             VALUES (?, ?, ?, ?, ?, ?)
             ''',
-            (name, amount_to_reach, amount_reached, category_id, currency, start_date)
+            rows
         )
         conn.commit()
 
@@ -24,45 +28,31 @@ def edit_goal(
     new_category_id: Optional[int] = None,
     new_currency: Optional[str] = None
 ) -> None:
+    # None keeps the current value (COALESCE falls back to the column)
     with get_connection() as conn:
         cursor = conn.cursor()
 
-        cursor.execute(
-            '''
-            SELECT name, amount_to_reach, amount_reached, category_id, currency
-            FROM goal
-            WHERE id = ?
-            ''',
-            (goal_id,)
-        )
-        row = cursor.fetchone()
-        if not row:
-            return
-
-        current_name, current_to_reach, current_reached, current_cat, current_curr = row
-
-        name            = new_name if new_name is not None else current_name
-        amount_to_reach = new_amount_to_reach if new_amount_to_reach is not None else current_to_reach
-        amount_reached  = new_amount_reached  if new_amount_reached  is not None else current_reached
-        category_id     = new_category_id     if new_category_id     is not None else current_cat
-        currency        = new_currency        if new_currency        is not None else current_curr
-
         cursor.execute(
             '''
             UPDATE goal
-            SET name = ?, amount_to_reach = ?, amount_reached = ?, category_id = ?, currency = ?
+            SET name            = COALESCE(?, name),
+                amount_to_reach = COALESCE(?, amount_to_reach),
+                amount_reached  = COALESCE(?, amount_reached),
+                category_id     = COALESCE(?, category_id),
+                currency        = COALESCE(?, currency)
             WHERE id = ?
             ''',
-            (name, amount_to_reach, amount_reached, category_id, currency, goal_id)
+            (new_name, new_amount_to_reach, new_amount_reached, new_category_id, new_currency, goal_id)
         )
 
         conn.commit()
 
-def remove_goal(goal_id: int) -> None:
+def remove_goal(goal_id: int) -> int:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('DELETE FROM goal WHERE id = ?', (goal_id,))
         conn.commit()
+        return cursor.rowcount
 
 def get_goal_by_id(goal_id: int) -> Optional[Tuple]:
     with get_connection() as conn:
@@ -1,15 +1,34 @@
 from __future__ import annotations
 
 from typing import Optional, Dict, Any
+import base64
+import hashlib
+import hmac
 import json
+import os
 from datetime import datetime
+from functools import lru_cache
 
 from backend.db import get_connection
 
 
+# Column set of the profile table. The schema only changes through
+# migrate_profile_schema, which clears this via invalidate_profile_columns().
+_PROFILE_COLS: set[str] | None = None
+
+def invalidate_profile_columns() -> None:
+    global _PROFILE_COLS
+    _PROFILE_COLS = None
+
 def _profile_columns(cur) -> set[str]:
-    cur.execute("PRAGMA table_info(profile);")
-    return {row[1] for row in cur.fetchall()}
+    global _PROFILE_COLS
+    if _PROFILE_COLS is None:
+        cur.execute("PRAGMA table_info(profile);")
+        cols = {row[1] for row in cur.fetchall()}
+        if not cols:
+            return cols  # table missing; don't cache
+        _PROFILE_COLS = cols
+    return _PROFILE_COLS
 
 def upsert_profile(
     *,
@@ -32,13 +51,13 @@ def upsert_profile(
         fields["photo_path"] = photo_path
     if monthly_budget is not None:
         fields["monthly_budget"] = float(monthly_budget)
-    if main_wallet_id is not None or main_wallet_id is None:
+    if main_wallet_id is not None:
         fields["main_wallet_id"] = main_wallet_id
     if skip_months is not None:
         fields["skip_months"] = json.dumps(list(skip_months))
     if password_hash is not None:
         fields["password_hash"] = password_hash
-    if theme is not None or theme is None:
+    if theme is not None:
         fields["theme"] = theme
 
     if not fields:
@@ -51,33 +70,27 @@ def upsert_profile(
         # Only keep keys that actually exist in the table
         fields = {k: v for k, v in fields.items() if k in cols}
 
-        cur.execute("SELECT id FROM profile ORDER BY id LIMIT 1")
-        row = cur.fetchone()
+        # One statement: target the existing singleton row (or id 1 when the
+        # table is empty) and let ON CONFLICT turn the insert into an update.
+        # Name is required by schema; default it for a fresh row only.
+        insert_vals = {**fields, "name": fields.get("name") or "User"}
+        insert_cols = list(insert_vals.keys())
+        placeholders = ", ".join(["?"] * len(insert_cols))
 
-        if row is None:
-            # Insert new row – name is required by schema; default if not provided
-            name_val = fields.pop("name", None) or "User"
-            insert_cols = ["name"] + list(fields.keys())
-            insert_vals = [name_val] + list(fields.values())
-            placeholders = ", ".join(["?"] * len(insert_cols))
-            sql = f"INSERT INTO profile ({', '.join(insert_cols)}) VALUES ({placeholders})"
-            cur.execute(sql, insert_vals)
-        else:
-            # Update existing row
-            set_parts = [f"{k} = ?" for k in fields.keys()]
-            params = list(fields.values())
+        set_parts = [f"{k} = ?" for k in fields.keys()]
+        params = list(insert_vals.values()) + list(fields.values())
+        # Only add updated_at if the column exists
+        if "updated_at" in cols:
+            set_parts.append("updated_at = ?")
+            params.append(datetime.utcnow().isoformat(timespec="seconds"))
+        on_conflict = f"DO UPDATE SET {', '.join(set_parts)}" if set_parts else "DO NOTHING"
 
-            # Only add updated_at if the column exists
-            if "updated_at" in cols:
-                set_parts.append("updated_at = ?")
-                params.append(datetime.utcnow().isoformat(timespec="seconds"))
-
-            sql = (
-                "UPDATE profile "
-                f"SET {', '.join(set_parts)} "
-                "WHERE id = (SELECT id FROM profile ORDER BY id LIMIT 1)"
-            )
-            cur.execute(sql, params)
+        sql = (
+            f"INSERT INTO profile (id, {', '.join(insert_cols)}) "
+            f"VALUES (COALESCE((SELECT id FROM profile ORDER BY id LIMIT 1), 1), {placeholders}) "
+            f"ON CONFLICT(id) {on_conflict}"
+        )
+        cur.execute(sql, params)
 
         conn.commit()
         return True
@@ -106,30 +119,15 @@ def get_current_profile() -> Dict[str, Any] | None:
         if not row:
             return None
 
-        (pid, name, photo_path, monthly_budget,
-         main_wallet_id, skip_months, password_hash,
-         created_at, last_login, theme_val) = row
-
-        parsed_skip: Any = skip_months
-        if isinstance(skip_months, str) and skip_months.strip().startswith("["):
-            try:
-                parsed_skip = json.loads(skip_months)
-            except Exception:
-                parsed_skip = skip_months
-
-        return {
-            "id": pid,
-            "name": name,
-            "photo_path": photo_path,
-            "monthly_budget": monthly_budget,
-            "main_wallet_id": main_wallet_id,
-            "skip_months": parsed_skip,
-            "password_hash": password_hash,
-            "created_at": created_at,
-            "last_login": last_login,
-            "theme": theme_val,
-            "theme_id": theme_val,
-        }
+    profile = dict(row)
+    skip_months = profile["skip_months"]
+    if isinstance(skip_months, str) and skip_months.strip().startswith("["):
+        try:
+            profile["skip_months"] = json.loads(skip_months)
+        except Exception:
+            pass
+    profile["theme_id"] = profile["theme"]
+    return profile
 
 def update_last_login(when: datetime | None = None) -> bool:
     """Set profile.last_login to the given datetime (UTC ISO) or now (and updated_at if that column exists)."""
@@ -188,16 +186,25 @@ def is_password_set() -> bool:
             return False
         return bool(row[0])
 
+# New hashes use scrypt (memory-hard, runs inside OpenSSL) when this Python's
+# hashlib was built with it; otherwise PBKDF2-SHA256. Both formats verify.
+_SCRYPT_N, _SCRYPT_R, _SCRYPT_P = 2 ** 14, 8, 1
+_PBKDF2_ITERATIONS = 200_000
+
 def set_password(password: str) -> None:
     if not isinstance(password, str) or password == "":
         raise ValueError("Password must be a non-empty string.")
-    import os, hashlib, base64
-    iterations = 200_000
     salt = os.urandom(16)
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
     salt_b64 = base64.b64encode(salt).decode("ascii")
-    dk_b64 = base64.b64encode(dk).decode("ascii")
-    stored = f"pbkdf2_sha256${iterations}${salt_b64}${dk_b64}"
+    if hasattr(hashlib, "scrypt"):
+        dk = hashlib.scrypt(password.encode("utf-8"), salt=salt, n=_SCRYPT_N, r=_SCRYPT_R, p=_SCRYPT_P, dklen=32)
+        dk_b64 = base64.b64encode(dk).decode("ascii")
+        stored = f"scrypt${_SCRYPT_N}${_SCRYPT_R}${_SCRYPT_P}${salt_b64}${dk_b64}"
+    else:
+        iterations = _PBKDF2_ITERATIONS
+        dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+        dk_b64 = base64.b64encode(dk).decode("ascii")
+        stored = f"pbkdf2_sha256${iterations}${salt_b64}${dk_b64}"
     pid = _get_or_create_profile_id()
     if pid is None:
         raise RuntimeError("Failed to ensure profile row exists.")
@@ -206,25 +213,50 @@ def set_password(password: str) -> None:
         cur.execute("UPDATE profile SET password_hash = ? WHERE id = ?", (stored, pid))
         conn.commit()
 
+@lru_cache(maxsize=8)
+def _parse_password_hash(stored: str) -> Optional[tuple]:
+    """
+    Split and base64-decode a stored hash once per distinct value.
+    Returns ("scrypt", (n, r, p), salt, dk), ("pbkdf2_sha256", iterations, salt, dk)
+    or None when the format is not recognised.
+    """
+    try:
+        algo, params = stored.split("$", 1)
+        if algo == "scrypt":
+            n_s, r_s, p_s, salt_b64, dk_b64 = params.split("$", 4)
+            cost = (int(n_s), int(r_s), int(p_s))
+        elif algo == "pbkdf2_sha256":
+            iter_s, salt_b64, dk_b64 = params.split("$", 2)
+            cost = int(iter_s)
+        else:
+            return None
+        return algo, cost, base64.b64decode(salt_b64), base64.b64decode(dk_b64)
+    except Exception:
+        return None
+
 def verify_password(password: str) -> bool:
     if not isinstance(password, str):
         return False
-    import hashlib, base64, hmac
     with get_connection() as conn:
         cur = conn.cursor()
         cur.execute("SELECT password_hash FROM profile ORDER BY id LIMIT 1")
         row = cur.fetchone()
         if not row or not row[0]:
             return False
-        stored = str(row[0])
+        stored = row[0]
+    parsed = _parse_password_hash(stored)
+    if parsed is None:
+        return False
+    algo, cost, salt, dk_stored = parsed
     try:
-        algo, iter_s, salt_b64, dk_b64 = stored.split("$", 3)
-        if algo != "pbkdf2_sha256":
-            return False
-        iterations = int(iter_s)
-        salt = base64.b64decode(salt_b64)
-        dk_stored = base64.b64decode(dk_b64)
-        dk_check = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+        if algo == "scrypt":
+            n, r, p = cost
+            dk_check = hashlib.scrypt(
+                password.encode("utf-8"), salt=salt,
+                n=n, r=r, p=p, dklen=len(dk_stored),
+            )
+        else:
+            dk_check = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, cost)
         return hmac.compare_digest(dk_stored, dk_check)
     except Exception:
         return False
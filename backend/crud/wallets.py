@@ -1,50 +1,47 @@
 from backend.db import get_connection
-from typing import List, Optional, Tuple
-import sqlite3
-
-DB_PATH = "database/budget_tracker.db"
+from typing import Iterable, List, Optional, Tuple
 
 def add_wallet(name: str, amount: float = 0.0, currency: str = "EUR") -> None:
+    add_wallets_bulk([(name, amount, currency)])
+
+def add_wallets_bulk(rows: Iterable[Tuple]) -> None:
+    '''
+    Inserts many wallets in one transaction.
+    Each row is (name, amount, currency).
+    '''
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute(
+        cursor.executemany(
             '''
             INSERT INTO wallet (name, amount, currency)
             VALUES (?, ?, ?)
             ''',
-            (name, amount, currency)
+            rows
         )
         conn.commit()
 
 def edit_wallet(wallet_id: int, new_name: Optional[str] = None, new_amount: Optional[float] = None, new_currency: Optional[str] = None) -> None:
+    # None keeps the current value (COALESCE falls back to the column)
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT name, amount, currency FROM wallet WHERE id = ?', (wallet_id,))
-        row = cursor.fetchone()
-        if not row:
-            return  # silently exit if wallet not found
-
-        current_name, current_amount, current_currency = row
-
-        name = new_name if new_name is not None else current_name
-        amount = new_amount if new_amount is not None else current_amount
-        currency = new_currency if new_currency is not None else current_currency
-
         cursor.execute(
             '''
             UPDATE wallet
-            SET name = ?, amount = ?, currency = ?
+            SET name = COALESCE(?, name),
+                amount = COALESCE(?, amount),
+                currency = COALESCE(?, currency)
             WHERE id = ?
             ''',
-            (name, amount, currency, wallet_id)
+            (new_name, new_amount, new_currency, wallet_id)
         )
         conn.commit()
 
-def remove_wallet(wallet_id: int) -> None:
+def remove_wallet(wallet_id: int) -> int:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('DELETE FROM wallet WHERE id = ?', (wallet_id,))
         conn.commit()
+        return cursor.rowcount
 
 def get_wallet_by_id(wallet_id: int) -> Optional[Tuple]:
     with get_connection() as conn:
@@ -55,11 +52,23 @@ def get_wallet_by_id(wallet_id: int) -> Optional[Tuple]:
 def get_wallets_by_currency(currency: str) -> List[int]:
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT id FROM wallet WHERE currency = ?', (currency,))
-        return [row[0] for row in cursor.fetchall()]
+        return [row[0] for row in cursor.execute('SELECT id FROM wallet WHERE currency = ?', (currency,))]
+
+# Ties fall back to id, matching a stable sort of the id-ordered rows
+_WALLET_ORDER_QUERIES = {
+    key: f'SELECT id, name, amount, currency FROM wallet ORDER BY {clause}'
+    for key, clause in {
+        "id": "id ASC",
+        "currency": "currency ASC, id ASC",
+        "amount_desc": "amount DESC, id ASC",
+    }.items()
+}
 
-def get_all_wallets() -> List[int]:
+def get_all_wallets(order_by: str = "id") -> List[int]:
+    query = _WALLET_ORDER_QUERIES.get(order_by)
+    if query is None:
+        raise ValueError(f"Invalid order_by: {order_by!r}")
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT id, name, amount, currency FROM wallet')
+        cursor.execute(query)
         return cursor.fetchall()
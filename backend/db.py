@@ -2,8 +2,8 @@
 import sys
 import os
 import sqlite3
+import threading
 from pathlib import Path
-from contextlib import closing
 
 # ---------- Paths ----------
 def _app_root() -> Path:
@@ -33,78 +33,182 @@ def _load_schema_text() -> str:
     raise FileNotFoundError("Could not locate backend/schema.sql (checked backend/schema.sql and _internal/backend/schema.sql)")
 
 # ---------- DB ----------
+# One long-lived connection per (thread, db file). Reusing it skips the
+# connect/PRAGMA setup on every CRUD call and lets sqlite3's per-connection
+# statement cache hit for repeated SQL text.
+_TLS = threading.local()
+_STATEMENT_CACHE_SIZE = 256
+
+# Applied once per connection at open. WAL lets readers run alongside a writer
+# and, with synchronous=NORMAL, avoids an fsync on every commit. The -wal file
+# is truncated back to journal_size_limit after each checkpoint instead of
+# staying at its high-water mark.
+_CONNECTION_PRAGMAS = """
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+PRAGMA journal_size_limit = 67108864;
+PRAGMA temp_store = MEMORY;
+PRAGMA mmap_size = 268435456;
+PRAGMA cache_size = -20000;
+PRAGMA foreign_keys = ON;
+"""
+
+def _open_connection(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), cached_statements=_STATEMENT_CACHE_SIZE)
+    conn.executescript(_CONNECTION_PRAGMAS)
+    # Rows still index/unpack like tuples, and also map by column name
+    conn.row_factory = sqlite3.Row
+    return conn
+
 def get_connection(db_path: str | None = None):
+    """
+    Return the cached connection for this thread and database file, opening it
+    on first use. Callers use `with get_connection() as conn:` for
+    commit/rollback and must not close it.
+    """
     path = Path(db_path) if db_path else _db_path_default()
-    path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(path))
-    conn.execute("PRAGMA foreign_keys = ON")
+    key = str(path.resolve())
+    conns = getattr(_TLS, "conns", None)
+    if conns is None:
+        conns = _TLS.conns = {}
+    conn = conns.get(key)
+    if conn is None:
+        conn = conns[key] = _open_connection(path)
     return conn
 
+def begin_immediate(conn: sqlite3.Connection) -> None:
+    """Start a write transaction now (taking the write lock) unless one is already open."""
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+def data_stamp(db_path: str | None = None) -> tuple[int, int]:
+    """
+    Cheap token that changes whenever the database content may have changed:
+    this connection's total_changes (our own writes) plus PRAGMA data_version
+    (commits made through any other connection). Used to validate read caches.
+    """
+    conn = get_connection(db_path)
+    return conn.total_changes, conn.execute("PRAGMA data_version").fetchone()[0]
+
+def close_connection(db_path: str | None = None) -> None:
+    """Close and forget this thread's cached connection for `db_path`."""
+    path = Path(db_path) if db_path else _db_path_default()
+    conns = getattr(_TLS, "conns", None) or {}
+    conn = conns.pop(str(path.resolve()), None)
+    if conn is not None:
+        conn.close()
+
 def _has_core_tables(conn: sqlite3.Connection) -> bool:
-    cur = conn.cursor()
     try:
-        cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='expense'")
-        ok1 = cur.fetchone() is not None
-        cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='wallet'")
-        ok2 = cur.fetchone() is not None
-        return bool(ok1 and ok2)
+        row = conn.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type='table' AND name IN ('expense', 'wallet')"
+        ).fetchone()
+        return row[0] == 2
     except Exception:
         return False
 
+# Database files already initialized by this process
+_INITIALIZED: set[str] = set()
+
 def initialize_database(db_path: str | None = None):
     """
     Idempotent: runs schema only when tables are missing.
+    Repeat calls for the same file in one process return immediately.
     """
-    with closing(get_connection(db_path)) as conn:
-        if not _has_core_tables(conn):
-            schema = _load_schema_text()
-            conn.executescript(schema)  # your schema uses IF NOT EXISTS
-            try:
-                migrate_profile_schema(conn)  # keep your migrations
-            except Exception:
-                pass
-            conn.commit()
+    path = Path(db_path) if db_path else _db_path_default()
+    key = str(path.resolve())
+    if key in _INITIALIZED:
+        return
+    # Checked before connecting, since opening the connection creates the file
+    fresh_file = not path.exists() or path.stat().st_size == 0
+
+    conn = get_connection(db_path)
+    if fresh_file or not _has_core_tables(conn):
+        schema = _load_schema_text()
+        conn.executescript(schema)  # your schema uses IF NOT EXISTS
+        try:
+            migrate_profile_schema(conn)  # keep your migrations
+        except Exception:
+            pass
+        conn.commit()
+    else:
+        migrate_indexes(conn)
+    _INITIALIZED.add(key)
+
+# Mirrors the INDEXES block in schema.sql for databases created before it
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_expense_date ON expense(date);
+CREATE INDEX IF NOT EXISTS idx_expense_wallet_date ON expense(wallet_id, date);
+CREATE INDEX IF NOT EXISTS idx_expense_category ON expense(category_id);
+CREATE INDEX IF NOT EXISTS idx_wallet_currency ON wallet(currency);
+CREATE INDEX IF NOT EXISTS idx_goal_completed ON goal(completed);
+"""
+
+def migrate_indexes(conn: sqlite3.Connection):
+    conn.executescript(_INDEXES)
+
+# Columns migrate_profile_schema adds to older profile tables
+_PROFILE_MIGRATION_COLS = frozenset({
+    "photo_path", "monthly_budget", "main_wallet_id", "skip_months",
+    "password_hash", "export_format", "updated_at",
+})
 
 def migrate_profile_schema(conn: sqlite3.Connection):
     cur = conn.cursor()
     cur.execute("PRAGMA table_info(profile)")
     existing_cols = {row[1] for row in cur.fetchall()}
 
+    # Already migrated (every start after the first): nothing to do
+    if _PROFILE_MIGRATION_COLS.issubset(existing_cols):
+        return
+
     def add(sql: str): cur.execute(sql)
 
-    # --- User ---
-    if "photo_path" not in existing_cols:
-        add("ALTER TABLE profile ADD COLUMN photo_path TEXT")
-    if "monthly_budget" not in existing_cols:
-        add("ALTER TABLE profile ADD COLUMN monthly_budget REAL DEFAULT 0.0")
-
-    # --- Preferences ---
-    if "main_wallet_id" not in existing_cols:
-        add("ALTER TABLE profile ADD COLUMN main_wallet_id INTEGER")
-    if "skip_months" not in existing_cols:
-        add("ALTER TABLE profile ADD COLUMN skip_months TEXT DEFAULT '[]'")
-
-    # --- Security ---
-    if "password_hash" not in existing_cols:
-        add("ALTER TABLE profile ADD COLUMN password_hash TEXT")
-        existing_cols.add("password_hash")
-        if "backup_password" in existing_cols:
-            cur.execute("""
-                UPDATE profile
-                   SET password_hash = COALESCE(password_hash, backup_password)
-                 WHERE (password_hash IS NULL OR password_hash = '')
-                   AND backup_password IS NOT NULL AND backup_password <> ''
-            """)
-
-    # --- Export ---
-    if "export_format" not in existing_cols:
-        add("ALTER TABLE profile ADD COLUMN export_format TEXT DEFAULT 'CSV'")
-
-    # --- Bookkeeping ---
-    if "updated_at" not in existing_cols:
-        add("ALTER TABLE profile ADD COLUMN updated_at TIMESTAMP")
+    # sqlite3 does not open a transaction for DDL on its own; group the ALTERs
+    if not conn.in_transaction:
+        cur.execute("BEGIN")
+
+    try:
+        # --- User ---
+        if "photo_path" not in existing_cols:
+            add("ALTER TABLE profile ADD COLUMN photo_path TEXT")
+        if "monthly_budget" not in existing_cols:
+            add("ALTER TABLE profile ADD COLUMN monthly_budget REAL DEFAULT 0.0")
+
+        # --- Preferences ---
+        if "main_wallet_id" not in existing_cols:
+            add("ALTER TABLE profile ADD COLUMN main_wallet_id INTEGER")
+        if "skip_months" not in existing_cols:
+            add("ALTER TABLE profile ADD COLUMN skip_months TEXT DEFAULT '[]'")
+
+        # --- Security ---
+        if "password_hash" not in existing_cols:
+            add("ALTER TABLE profile ADD COLUMN password_hash TEXT")
+            existing_cols.add("password_hash")
+            if "backup_password" in existing_cols:
+                cur.execute("""
+                    UPDATE profile
+                       SET password_hash = COALESCE(password_hash, backup_password)
+                     WHERE (password_hash IS NULL OR password_hash = '')
+                       AND backup_password IS NOT NULL AND backup_password <> ''
+                """)
+
+        # --- Export ---
+        if "export_format" not in existing_cols:
+            add("ALTER TABLE profile ADD COLUMN export_format TEXT DEFAULT 'CSV'")
+
+        # --- Bookkeeping ---
+        if "updated_at" not in existing_cols:
+            add("ALTER TABLE profile ADD COLUMN updated_at TIMESTAMP")
+    except Exception:
+        conn.rollback()
+        raise
 
     conn.commit()
 
+    from backend.crud.profile import invalidate_profile_columns
+    invalidate_profile_columns()
+
 if __name__ == "__main__":
     initialize_database()
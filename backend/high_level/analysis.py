@@ -1,7 +1,7 @@
 # ─── Standard Library ────────────────────────────────────────────────────────
-from datetime import datetime, timedelta
-from collections import defaultdict, Counter
-from statistics import mean, median
+from datetime import date, datetime, timedelta
+from collections import defaultdict
+import heapq
 from typing import Optional, Union, Dict, List, Tuple
 
 # ─── Third-Party Libraries ──────────────────────────────────────────────────
@@ -14,10 +14,10 @@ try:
 except Exception:
     CURRENCY_FREAKS_API_KEY = ""
 
-from backend.crud.wallets import get_all_wallets, get_wallet_by_id
-from backend.crud.expenses import add_expense, get_all_expenses 
-from backend.crud.categories import get_all_categories,get_all_categories_full
-from backend.db import get_connection
+from backend.crud.wallets import get_all_wallets
+from backend.crud.expenses import add_expenses_bulk
+from backend.crud.categories import get_category_ids_by_type
+from backend.db import get_connection, begin_immediate
 
 # ─────────────────────────────
 # 💸 EXPENSE FUNCTIONS
@@ -31,6 +31,7 @@ def redo_expense(expense_id: int) -> None:
         3. Deleting the expense entry
     '''
     with get_connection() as conn:
+        begin_immediate(conn)
         cursor = conn.cursor()
 
         # Get the expense details
@@ -46,28 +47,16 @@ def redo_expense(expense_id: int) -> None:
 
         cost, wallet_id = expense
 
-        # Get current wallet balance
+        # Refund the wallet; leave the expense alone if the wallet is gone
         cursor.execute(
             '''
-            SELECT amount FROM wallet WHERE id = ?
+            UPDATE wallet SET amount = amount + ? WHERE id = ?
             ''',
-            (wallet_id,)
+            (cost, wallet_id)
         )
-        wallet = cursor.fetchone()
-        if not wallet:
+        if cursor.rowcount == 0:
             return
 
-        current_balance = wallet[0]
-        new_balance = current_balance + cost
-
-        # Update wallet balance
-        cursor.execute(
-            '''
-            UPDATE wallet SET amount = ? WHERE id = ?
-            ''',
-            (new_balance, wallet_id)
-        )
-
         # Delete the expense
         cursor.execute(
             '''
@@ -90,41 +79,48 @@ def record_expense(
     Records a new expense:
         1. Inserts the expense into the database
         2. Deducts the cost from the specified wallet's balance
+    Both steps run in one transaction.
     '''
-    add_expense(
-        name=name,
-        cost=cost,
-        date_str=date_str,
-        category_id=category_id,
-        wallet_id=wallet_id,
-        description=description
-    )
+    record_expenses([{
+        "name": name,
+        "cost": cost,
+        "date_str": date_str,
+        "category_id": category_id,
+        "wallet_id": wallet_id,
+        "description": description,
+    }])
+
+def record_expenses(rows: List[dict]) -> None:
+    '''
+    Batch form of record_expense for imports: rows are dicts with
+    record_expense's keyword names. All expenses are inserted and each
+    wallet is debited once by its summed cost, in a single transaction.
+    '''
+    expense_rows = []
+    wallet_deltas = defaultdict(float)
+    for row in rows:
+        expense_rows.append((
+            row["name"], row["cost"], row["date_str"],
+            row.get("category_id"), row.get("wallet_id"), row.get("description")
+        ))
+        if row.get("wallet_id") is not None:
+            wallet_deltas[row["wallet_id"]] += row["cost"]
+
+    if not expense_rows:
+        return
 
     with get_connection() as conn:
-        cursor = conn.cursor()
+        begin_immediate(conn)
+        add_expenses_bulk(expense_rows, conn=conn)
 
-        cursor.execute(
-            '''
-            SELECT amount
-            FROM wallet
-            WHERE id = ?
-            ''',
-            (wallet_id,)
-        )
-        wallet = cursor.fetchone()
-        if not wallet:
-            return
-
-        current_balance = wallet[0]
-        new_balance = current_balance - cost
-
-        cursor.execute(
+        # Unknown wallets are a no-op; the expenses are kept either way
+        conn.cursor().executemany(
             '''
             UPDATE wallet
-            SET amount = ?
+            SET amount = amount - ?
             WHERE id = ?
             ''',
-            (new_balance, wallet_id)
+            [(delta, wallet_id) for wallet_id, delta in wallet_deltas.items()]
         )
 
         conn.commit()
@@ -143,20 +139,16 @@ def month_comparasion(reference_date: Optional[str] = None, toggle_state: int =
     last_month = first_day_current - timedelta(days=1)
     previous_month = last_month.strftime("%Y-%m")
 
-    expenses = get_all_expenses()
-    categories = get_all_categories()
-    filtered_expenses = filter_expenses_by_toggle(expenses, categories, toggle_state)
-
-    if isinstance(main_wallet, int):
-        _w = get_wallet_by_id(main_wallet)
-        filtered_expenses = [e for e in filtered_expenses if len(e) > 6 and e[6] == main_wallet]
+    filter_sql, filter_params = _expense_filter_sql(toggle_state, main_wallet)
 
     def total_for_month(month_str: str) -> float:
-        return sum(
-            float(e[3])
-            for e in filtered_expenses
-            if isinstance(e[4], str) and e[4].startswith(month_str)
-        )
+        start, end = _month_range(month_str)
+        with get_connection() as conn:
+            row = conn.execute(
+                f"SELECT COALESCE(SUM(cost), 0) FROM expense WHERE date >= ? AND date < ?{filter_sql}",
+                (start, end, *filter_params)
+            ).fetchone()
+        return row[0]
 
     current_total = total_for_month(current_month)
     previous_total = total_for_month(previous_month)
@@ -178,24 +170,27 @@ def weekly_expenses(n: int, toggle_state: int = 0) -> Dict[str, float]:
     today = datetime.today().date()
     start_date = today - timedelta(weeks=n)
 
-    expenses = get_all_expenses()
-    categories = get_all_categories()
-    filtered_expenses = filter_expenses_by_toggle(expenses, categories, toggle_state)
+    # SQL does the date cut and sums per day; only ISO-week bucketing
+    # (no %G/%V in SQLite's strftime) stays in Python.
+    filter_sql, filter_params = _expense_filter_sql(toggle_state)
+    with get_connection() as conn:
+        daily = conn.execute(
+            f"SELECT date, SUM(cost) FROM expense WHERE date >= ?{filter_sql} GROUP BY date",
+            (start_date.isoformat(), *filter_params)
+        ).fetchall()
 
     weekly_totals = defaultdict(float)
 
-    for exp in filtered_expenses:
-        date_str = exp[4]       
-        cost = float(exp[3])    
-        expense_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+    for date_str, cost in daily:
+        expense_date = date.fromisoformat(date_str)
 
         if expense_date >= start_date:
             iso_year, iso_week, _ = expense_date.isocalendar()
             week_key = f"{iso_year}-W{iso_week:02d}"
             weekly_totals[week_key] += cost
 
-    sorted_totals = dict(sorted(weekly_totals.items(), reverse=True))
-    return dict(list(sorted_totals.items())[:n])
+    # Newest n week keys ('YYYY-Www' sorts chronologically)
+    return dict(heapq.nlargest(n, weekly_totals.items(), key=lambda kv: kv[0]))
 
 def calc_descriptive_stats_per_month(month: str, toggle_state: int = 0) -> Dict[str, object]:
     '''
@@ -217,33 +212,43 @@ def calc_descriptive_stats_per_month(month: str, toggle_state: int = 0) -> Dict[
     except ValueError:
         raise ValueError("Month format should be 'MM-YYYY'")
 
-    expenses = get_all_expenses()
-    categories = get_all_categories()
-    filtered_expenses = filter_expenses_by_toggle(expenses, categories, toggle_state)
-
-    relevant_expenses = [
-        (exp[1], float(exp[3]))  
-        for exp in filtered_expenses
-        if exp[4].startswith(f"{year_part}-{month_part}")
-    ]
-
-    if not relevant_expenses:
-        return {
-            'mean': 0.0,
-            'median': 0.0,
-            'mode': 'No expenses in that month'
-        }
-
-    names = [e[0] for e in relevant_expenses]
-    costs = [e[1] for e in relevant_expenses]
-
-    mean_val = round(mean(costs), 2)
-    median_val = round(median(costs), 2)
+    start, end = _month_range(f"{year_part}-{month_part}")
+    filter_sql, filter_params = _expense_filter_sql(toggle_state)
+    where = f"date >= ? AND date < ?{filter_sql}"
+    params = (start, end, *filter_params)
 
-    name_counts = Counter(names)
-    most_common = name_counts.most_common(1)
-    if most_common and most_common[0][1] > 1:
-        mode_val = most_common[0][0]
+    with get_connection() as conn:
+        count, avg_cost = conn.execute(
+            f"SELECT COUNT(*), AVG(cost) FROM expense WHERE {where}", params
+        ).fetchone()
+
+        if not count:
+            return {
+                'mean': 0.0,
+                'median': 0.0,
+                'mode': 'No expenses in that month'
+            }
+
+        # Middle one (odd count) or two (even count) costs in sorted order
+        middle = conn.execute(
+            f"SELECT cost FROM expense WHERE {where} ORDER BY cost LIMIT ? OFFSET ?",
+            (*params, 2 - count % 2, (count - 1) // 2)
+        ).fetchall()
+
+        # Ties go to the name seen first, as Counter.most_common did
+        top_name = conn.execute(
+            f"""
+            SELECT name, COUNT(*) AS n FROM expense WHERE {where}
+            GROUP BY name ORDER BY n DESC, MIN(id) LIMIT 1
+            """,
+            params
+        ).fetchone()
+
+    mean_val = round(avg_cost, 2)
+    median_val = round(sum(r[0] for r in middle) / len(middle), 2)
+
+    if top_name[1] > 1:
+        mode_val = top_name[0]
     else:
         mode_val = "No expense is repeated"
 
@@ -292,79 +297,13 @@ def ordeBy(option: int):
 
     return results
 
-# backend/high_level/analysis.py
-
-    """
-    Deduct goal amount from wallet, log as an expense ('goal completed'),
-    and finally REMOVE the goal from the DB (not just mark completed).
-    """
-    with get_connection() as conn:
-        cursor = conn.cursor()
-
-        # 1) Read goal
-        cursor.execute(
-            '''
-            SELECT name, amount_to_reach, category_id, currency
-            FROM goal
-            WHERE id = ?
-            ''',
-            (goal_id,)
-        )
-        row = cursor.fetchone()
-        if not row:
-            print("Goal not found.")
-            return
-
-        name, amount, category_id, currency = row
-
-        # 2) Read wallet
-        cursor.execute(
-            '''
-            SELECT amount
-            FROM wallet
-            WHERE id = ?
-            ''',
-            (wallet_id,)
-        )
-        w = cursor.fetchone()
-        if not w:
-            print("Wallet not found.")
-            return
-
-        current_amount = float(w[0] or 0.0)
-        updated_amount  = current_amount - float(amount or 0.0)
-
-        # 3) Update wallet balance
-        cursor.execute(
-            '''
-            UPDATE wallet
-            SET amount = ?
-            WHERE id = ?
-            ''',
-            (updated_amount, wallet_id)
-        )
-
-        # 4) Log expense
-        today = get_current_time()
-        cursor.execute(
-            '''
-            INSERT INTO expense (name, category_id, cost, date, description, wallet_id)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ''',
-            (name, category_id, amount, today, 'goal completed', wallet_id)
-        )
-
-        # 5) Remove the goal (delete the row)
-        cursor.execute('DELETE FROM goal WHERE id = ?', (goal_id,))
-
-        conn.commit()
-
 def complete_goal(goal_id: int, wallet_id: int) -> None:
     """
     Deduct goal amount from wallet, log as an expense ('goal completed'),
     and finally REMOVE the goal from the DB (not just mark completed).
     """
     with get_connection() as conn:
+        begin_immediate(conn)
         cursor = conn.cursor()
 
         # 1) Read goal
@@ -383,34 +322,20 @@ def complete_goal(goal_id: int, wallet_id: int) -> None:
 
         name, amount, category_id, currency = row
 
-        # 2) Read wallet
+        # 2) Update wallet balance (rowcount 0 = wallet missing)
         cursor.execute(
             '''
-            SELECT amount
-            FROM wallet
+            UPDATE wallet
+            SET amount = COALESCE(amount, 0.0) - ?
             WHERE id = ?
             ''',
-            (wallet_id,)
+            (float(amount or 0.0), wallet_id)
         )
-        w = cursor.fetchone()
-        if not w:
+        if cursor.rowcount == 0:
             print("Wallet not found.")
             return
 
-        current_amount = float(w[0] or 0.0)
-        updated_amount  = current_amount - float(amount or 0.0)
-
-        # 3) Update wallet balance
-        cursor.execute(
-            '''
-            UPDATE wallet
-            SET amount = ?
-            WHERE id = ?
-            ''',
-            (updated_amount, wallet_id)
-        )
-
-        # 4) Log expense
+        # 3) Log expense
         today = get_current_time()
         cursor.execute(
             '''
@@ -420,7 +345,7 @@ def complete_goal(goal_id: int, wallet_id: int) -> None:
             (name, category_id, amount, today, 'goal completed', wallet_id)
         )
 
-        # 5) Remove the goal (delete the row)
+        # 4) Remove the goal (delete the row)
         cursor.execute('DELETE FROM goal WHERE id = ?', (goal_id,))
 
         conn.commit()
@@ -431,17 +356,16 @@ def complete_goal(goal_id: int, wallet_id: int) -> None:
 # ─────────────────────────────
 
 def format_currency(amount: float, symbol: str = '') -> str:
-    try:
-        return f"{symbol}{amount:,.2f}"
-    except:
+    # Non-numeric values are shown as-is
+    if not isinstance(amount, (int, float)):
         return str(amount)
+    return f"{symbol}{amount:,.2f}"
 
 def format_networth_dict(networth_dict: Dict[str, float]) -> str:
-    formatted_entries = [
-        format_currency(amount, symbol=f"{currency} ")
+    return ", ".join(
+        f"{currency} {amount:,.2f}" if isinstance(amount, (int, float)) else str(amount)
         for currency, amount in networth_dict.items()
-    ]
-    return ", ".join(formatted_entries)
+    )
 
 def get_current_time():
     return datetime.today().strftime('%Y-%m-%d')
@@ -449,18 +373,52 @@ def get_current_time():
 def get_MM_YYYY():
     return datetime.today().strftime('%m-%Y')
 
-def filter_expenses_by_toggle(expenses, categories, toggle_state):
+def filter_expenses_by_toggle(expenses, categories=None, toggle_state=0):
+    # categories=None uses the cached variable-category ids
     if toggle_state == 0:
         return expenses
-    valid_category_ids = {cat[0] for cat in categories if cat[3] == 0}
+    if categories is None:
+        valid_category_ids = get_category_ids_by_type(0)
+    else:
+        valid_category_ids = {cat[0] for cat in categories if cat[3] == 0}
     return [expense for expense in expenses if expense[2] in valid_category_ids]  # ✅ expense[2] = category_id
 
+def _month_range(year_month: str) -> Tuple[str, str]:
+    '''
+    ('YYYY-MM', next 'YYYY-MM') bounds for `date >= ? AND date < ?`, which
+    matches exactly the date strings starting with year_month.
+    '''
+    year, month = map(int, year_month.split("-"))
+    start = f"{year:04d}-{month:02d}"
+    end = f"{year + month // 12:04d}-{month % 12 + 1:02d}"
+    return start, end
+
+def _expense_filter_sql(toggle_state: int = 0, main_wallet: Optional[int] = None) -> Tuple[str, list]:
+    '''
+    Extra `AND ...` clauses (and their params) for an expense query, matching
+    filter_expenses_by_toggle plus an optional main-wallet filter.
+    '''
+    sql, params = "", []
+    if toggle_state != 0:
+        # Correlated probe on category's primary key; NULL category_id never matches
+        sql += " AND EXISTS (SELECT 1 FROM category c WHERE c.id = expense.category_id AND c.type = 0)"
+    if isinstance(main_wallet, int):
+        sql += " AND wallet_id = ?"
+        params.append(main_wallet)
+    return sql, params
+
 def generate_month_options(num_months_back=24):
+    # (year, month) from the current month backwards
     now = datetime.now()
-    return [
-        (now.year - ((now.month - i - 1) // 12), (now.month - i - 1) % 12 + 1)
-        for i in range(num_months_back)
-    ]
+    year, month = now.year, now.month
+    options = []
+    for _ in range(num_months_back):
+        options.append((year, month))
+        month -= 1
+        if month == 0:
+            month = 12
+            year -= 1
+    return options
 
 def format_month_tuple(ym_tuple):
     year, month = ym_tuple
@@ -483,16 +441,12 @@ def order_by(mode: int = 1) -> List[Tuple]:
     Returns:
         List of tuples representing wallets, sorted accordingly.
     '''
-    wallets = get_all_wallets()  
-
     if mode == 2:
-        sorted_wallets = sorted(wallets, key=lambda x: x[3])  
+        return get_all_wallets(order_by="currency")
     elif mode == 3:
-        sorted_wallets = sorted(wallets, key=lambda x: x[2], reverse=True)  
+        return get_all_wallets(order_by="amount_desc")
     else:
-        sorted_wallets = sorted(wallets, key=lambda x: x[0])  
-
-    return sorted_wallets
+        return get_all_wallets(order_by="id")
 
 def calc_networth(mode: int = 1, target_currency: str = None) -> Union[Dict[str, float], float]:
     '''
@@ -501,21 +455,20 @@ def calc_networth(mode: int = 1, target_currency: str = None) -> Union[Dict[str,
     Parameters:
         mode (int):
             1 - Return net worth per currency (e.g. {'EUR': 200.0, 'USD': 150.0})
-            2 - Return total net worth converted into a single currency using `currency_conversion`
+            2 - Total net worth in one currency. Not available: the app has no
+                exchange-rate source, so this mode raises ValueError
 
     Returns:
         If mode == 1: dict of {currency: total_amount}
-        If mode == 2: float representing total net worth in the target currency
     '''
-    wallets = get_all_wallets()
-
     if mode == 1:
-        currency_totals = {}
-        for wallet in wallets:
-            amount = wallet[2]
-            currency = wallet[3]
-            currency_totals[currency] = currency_totals.get(currency, 0) + amount
-        return currency_totals
+        # Currencies keep the order of their first wallet
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT currency, SUM(amount) FROM wallet GROUP BY currency ORDER BY MIN(id)"
+            )
+            return dict(cursor.fetchall())
 
 
     else:
@@ -524,7 +477,7 @@ def calc_networth(mode: int = 1, target_currency: str = None) -> Union[Dict[str,
 def transfer_money(giver_wallet_id: int, receiver_wallet_id: int, amount: float) -> None:
     '''
     Transfers money from one wallet to another.
-    If the currencies differ, performs automatic conversion using currency_conversion().
+    Wallets in different currencies are left unchanged; there is no conversion.
     
     Parameters:
         giver_wallet_id (int): ID of the wallet giving the money
@@ -532,55 +485,55 @@ def transfer_money(giver_wallet_id: int, receiver_wallet_id: int, amount: float)
         amount (float): Amount to transfer from giver
     '''
     with get_connection() as conn:
+        begin_immediate(conn)
         cursor = conn.cursor()
 
-        cursor.execute("SELECT amount, currency FROM wallet WHERE id = ?", (giver_wallet_id,))
-        giver = cursor.fetchone()
-        if not giver:
-            return
-        giver_amount, giver_currency = giver
-
-        if amount <= 0 or giver_amount < amount:
+        if amount <= 0:
             return
 
-        cursor.execute("SELECT amount, currency FROM wallet WHERE id = ?", (receiver_wallet_id,))
-        receiver = cursor.fetchone()
-        if not receiver:
+        # Credit the receiver only if it shares the giver's currency
+        cursor.execute(
+            """
+            UPDATE wallet SET amount = ROUND(amount + ?, 2)
+            WHERE id = ? AND currency = (SELECT currency FROM wallet WHERE id = ?)
+            """,
+            (amount, receiver_wallet_id, giver_wallet_id)
+        )
+        if cursor.rowcount != 1:
+            conn.rollback()
             return
-        receiver_amount, receiver_currency = receiver
 
-        if giver_currency != receiver_currency:
+        # Debit the giver only if it can cover the amount
+        cursor.execute(
+            "UPDATE wallet SET amount = ROUND(amount - ?, 2) WHERE id = ? AND amount >= ?",
+            (amount, giver_wallet_id, amount)
+        )
+        if cursor.rowcount != 1:
+            conn.rollback()
             return
 
-        new_giver_amount = round(giver_amount - amount, 2)
-        new_receiver_amount = round(receiver_amount + amount, 2)
-
-        cursor.execute("UPDATE wallet SET amount = ? WHERE id = ?", (new_giver_amount, giver_wallet_id))
-        cursor.execute("UPDATE wallet SET amount = ? WHERE id = ?", (new_receiver_amount, receiver_wallet_id))
         conn.commit()
 
 def get_avg_monthly_expense(exclude_months: list = [], only_non_fixed: bool = False) -> float:
-    expenses = get_all_expenses()
-    categories = get_all_categories_full()
-    fixed_ids = {cat[0] for cat in categories if cat[3] == 1}
-
-    monthly_totals = defaultdict(float)
-
-    for exp in expenses:
-        try:
-            category_id = exp[2]
-            amount = float(exp[3])
-            date_obj = datetime.strptime(exp[4], "%Y-%m-%d")
-            year_month = (date_obj.year, date_obj.month)
+    # Monthly totals come straight from SQL; rows whose date is not
+    # 'YYYY-MM-DD' are skipped, and the month key is sliced, not parsed.
+    sql = (
+        "SELECT substr(date, 1, 7) AS ym, SUM(cost) FROM expense "
+        "WHERE date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"
+    )
+    if only_non_fixed:
+        sql += " AND NOT EXISTS (SELECT 1 FROM category c WHERE c.id = expense.category_id AND c.type = 1)"
+    sql += " GROUP BY ym"
 
-            if year_month in exclude_months:
-                continue
-            if only_non_fixed and category_id in fixed_ids:
-                continue
+    with get_connection() as conn:
+        rows = conn.execute(sql).fetchall()
 
-            monthly_totals[year_month] += amount
-        except Exception:
+    monthly_totals = {}
+    for ym, total in rows:
+        year_month = (int(ym[:4]), int(ym[5:7]))
+        if year_month in exclude_months:
             continue
+        monthly_totals[year_month] = total
 
     if not monthly_totals:
         return 0.0
@@ -675,11 +628,16 @@ def networth_by_currency_table_qt():
     table.setAlternatingRowColors(True)
     table.verticalHeader().setVisible(False)
 
+    # Fill with repaints and itemChanged signals off, as the manage tables do
+    table.setUpdatesEnabled(False)
+    table.blockSignals(True)
     for r, (cur, amt) in enumerate(items):
         amt_item = QTableWidgetItem(f"{amt:.2f}")
         amt_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
         table.setItem(r, 0, amt_item)
         table.setItem(r, 1, QTableWidgetItem(cur))
+    table.blockSignals(False)
+    table.setUpdatesEnabled(True)
 
     hdr = table.horizontalHeader()
     hdr.setSectionResizeMode(0, QHeaderView.ResizeToContents)  # Amount
@@ -5,9 +5,20 @@ import io
 import os
 import json
 import sqlite3
-from datetime import datetime
-from typing import List, Tuple, Optional, Dict, Any
-from zipfile import ZipFile, ZIP_DEFLATED
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, Tuple, Optional, Any
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
+
+try:
+    import orjson  # optional: faster JSON encoding, falls back to stdlib json
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard  # optional: only needed for export_all_to_sql(compress=True)
+except ImportError:
+    zstandard = None
 
 from backend.db import get_connection
 
@@ -19,29 +30,101 @@ _EXPORT_TABLES: Tuple[str, ...] = (
     "profile",
 )
 
-def _fetch_table(conn: sqlite3.Connection, table: str) -> Tuple[List[str], List[sqlite3.Row]]:
+# Table entries in ZIP exports: deflate level 1 keeps most of the ratio of the
+# default level 6 at a fraction of the CPU; the tiny manifests are stored.
+_ZIP_LEVEL = 1
+
+# Pages copied per backup() step in export_all_to_db
+_BACKUP_PAGES = 1024
+
+def _ts() -> str:
+    # Timestamp used in default file names and export metadata
+    return time.strftime("%Y%m%d_%H%M%S")
+
+# The app connection already runs in WAL with synchronous=NORMAL and
+# temp_store=MEMORY (backend.db); exports only raise its page cache to
+# 64 MiB while they scan every table, then put it back. All reads of one
+# export share a single DEFERRED transaction, i.e. one WAL snapshot, so the
+# tables are mutually consistent even if the app writes meanwhile.
+_EXPORT_CACHE_SIZE = -65536
+
+@contextmanager
+def _export_connection(db_path: str):
+    with get_connection(db_path) as conn:
+        prev_cache = conn.execute("PRAGMA cache_size").fetchone()[0]
+        conn.execute(f"PRAGMA cache_size = {_EXPORT_CACHE_SIZE}")
+        if not conn.in_transaction:
+            conn.execute("BEGIN DEFERRED")
+        try:
+            yield conn
+        finally:
+            conn.execute(f"PRAGMA cache_size = {int(prev_cache)}")
+
+# Rows pulled per fetchmany() call; bounds memory to one batch per table
+_FETCH_BATCH = 10_000
+
+def _iter_table(conn: sqlite3.Connection, table: str, batch: int = _FETCH_BATCH) -> Tuple[List[str], Iterator[List[sqlite3.Row]]]:
     cur = conn.cursor()
-    # Ensure table exists
-    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,))
-    if cur.fetchone() is None:
-        return [], []
-
-    # Column order
-    cur.execute(f"PRAGMA table_info({table})")
-    cols = [r[1] for r in cur.fetchall()]  # r[1] = column name
-
-    # Rows (stable order)
-    order_clause = " ORDER BY id ASC" if "id" in cols else ""
-    cur.execute(f"SELECT * FROM {table}{order_clause}")
-    rows = cur.fetchall()
-    return cols, rows
-
-def _rows_to_dicts(cols: List[str], rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    for r in rows:
-        # r can be a tuple; map by index to column name
-        out.append({c: (r[i] if r[i] is not None else None) for i, c in enumerate(cols)})
-    return out
+    # One statement per table: a missing table or `id` column shows up as an
+    # OperationalError, and the column names come from cursor.description.
+    try:
+        cur.execute(f"SELECT * FROM {table} ORDER BY id ASC")
+    except sqlite3.OperationalError as e:
+        if "no such table" in str(e):
+            return [], iter(())
+        cur.execute(f"SELECT * FROM {table}")
+    cols = [d[0] for d in cur.description]
+
+    def batches() -> Iterator[List[sqlite3.Row]]:
+        while True:
+            rows = cur.fetchmany(batch)
+            if not rows:
+                return
+            yield rows
+
+    return cols, batches()
+
+def _json_encoder(pretty: bool) -> Callable[[Any], bytes]:
+    # Options are resolved once; the returned callable is what runs per row
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        return lambda obj: orjson.dumps(obj, option=option)
+    encoder = json.JSONEncoder(
+        ensure_ascii=False,
+        indent=2 if pretty else None,
+        separators=None if pretty else (",", ":"),
+    )
+    return lambda obj: encoder.encode(obj).encode("utf-8")
+
+def _json_bytes(obj: Any, pretty: bool) -> bytes:
+    return _json_encoder(pretty)(obj)
+
+def _write_json_array(
+    f,
+    cols: List[str],
+    batches: Iterable[List[sqlite3.Row]],
+    pretty: bool,
+    scratch: Optional[bytearray] = None,
+) -> None:
+    # Streams a JSON array of row objects into a binary file object. Each
+    # fetched batch is encoded into `scratch` (reusable across tables) and
+    # handed to f in one write.
+    buf = scratch if scratch is not None else bytearray()
+    encode = _json_encoder(pretty)
+    cols_tuple = tuple(cols)  # rows follow this order (cursor.description)
+    nl = b"\n" if pretty else b""
+    sep = b"," + nl
+    f.write(b"[")
+    first = True
+    for rows in batches:
+        buf.clear()
+        for r in rows:
+            buf += nl if first else sep
+            buf += encode(dict(zip(cols_tuple, r)))
+            first = False
+        f.write(buf)
+    buf.clear()
+    f.write(b"]" if first else nl + b"]")
 
 def export_all_to_csv(
     db_path: str = "budget_tracker.db",
@@ -60,13 +143,14 @@ def export_all_to_csv(
 
     Returns the path to the created file (CSV or ZIP).
     """
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    ts = _ts()
+    abs_db = os.path.abspath(db_path)
     if out_path is None:
         out_path = f"export_all_{ts}.csv" if not separate_files else f"export_all_{ts}.zip"
 
     os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
 
-    with get_connection(db_path) as conn:
+    with _export_connection(db_path) as conn:
         if not separate_files:
             # Single CSV with sections
             with open(out_path, "w", newline="", encoding="utf-8") as f:
@@ -74,34 +158,33 @@ def export_all_to_csv(
                 # Optional metadata header
                 w.writerow(["__EXPORT__", "Finance Tool", "timestamp", ts])
                 for table in _EXPORT_TABLES:
-                    cols, rows = _fetch_table(conn, table)
-                    # Section marker for clarity/tools
-                    w.writerow([])
-                    w.writerow(["__TABLE__", table])
+                    cols, batches = _iter_table(conn, table)
+                    # Blank line + section marker (for clarity/tools) + header, in one call
+                    w.writerows([[], ["__TABLE__", table], cols if cols else ["(no columns)"]])
                     if cols:
-                        w.writerow(cols)
-                        for row in rows:
-                            # row is sequence-like; index by column order
-                            w.writerow([row[i] if row[i] is not None else "" for i in range(len(cols))])
-                    else:
-                        w.writerow(["(no columns)"])
+                        # csv writes None as an empty field; rows are in column order.
+                        # writerows formats every cell in C, which beats a hand-rolled
+                        # b','.join(str(v).encode()) serializer even for numeric rows.
+                        for rows in batches:
+                            w.writerows(rows)
             return out_path
         else:
             # Multiple CSVs packaged into a ZIP
-            with ZipFile(out_path, "w", compression=ZIP_DEFLATED) as zf:
+            with ZipFile(out_path, "w", compression=ZIP_DEFLATED, compresslevel=_ZIP_LEVEL) as zf:
                 # Optional: include a small manifest
-                manifest = f"export_timestamp,{ts}\nsource_db,{os.path.abspath(db_path)}\n"
-                zf.writestr("manifest.csv", manifest)
+                manifest = f"export_timestamp,{ts}\nsource_db,{abs_db}\n"
+                zf.writestr("manifest.csv", manifest, compress_type=ZIP_STORED)
 
                 for table in _EXPORT_TABLES:
-                    cols, rows = _fetch_table(conn, table)
-                    buf = io.StringIO()
-                    w = csv.writer(buf, lineterminator="\n")
-                    if cols:
-                        w.writerow(cols)
-                        for row in rows:
-                            w.writerow([row[i] if row[i] is not None else "" for i in range(len(cols))])
-                    zf.writestr(f"{table}.csv", buf.getvalue())
+                    cols, batches = _iter_table(conn, table)
+                    # Encode and deflate straight into the archive entry
+                    with zf.open(f"{table}.csv", "w", force_zip64=True) as raw, \
+                            io.TextIOWrapper(raw, encoding="utf-8", newline="") as txt:
+                        w = csv.writer(txt, lineterminator="\n")
+                        if cols:
+                            w.writerow(cols)
+                            for rows in batches:
+                                w.writerows(rows)
             return out_path
 
 def export_all_to_json(
@@ -129,54 +212,94 @@ def export_all_to_json(
 
     Returns the path to the created file (JSON or ZIP).
     """
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    ts = _ts()
+    abs_db = os.path.abspath(db_path)
     if out_path is None:
         out_path = f"export_all_{ts}.json" if not separate_files else f"export_all_{ts}.zip"
 
     os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
 
-    with get_connection(db_path) as conn:
+    with _export_connection(db_path) as conn:
+        scratch = bytearray()  # reused for every table's batches
+
         if not separate_files:
-            payload = {
-                "export": {
-                    "app": "Finance Tool",
-                    "timestamp": ts,
-                    "source_db": os.path.abspath(db_path),
-                    "format": "single-json",
-                },
-                "tables": {},
+            # Written table by table so only one table's rows are held at once
+            export_meta = {
+                "app": "Finance Tool",
+                "timestamp": ts,
+                "source_db": abs_db,
+                "format": "single-json",
             }
-            for table in _EXPORT_TABLES:
-                cols, rows = _fetch_table(conn, table)
-                payload["tables"][table] = _rows_to_dicts(cols, rows) if cols else []
-
-            with open(out_path, "w", encoding="utf-8") as f:
-                json.dump(payload, f, ensure_ascii=False, indent=2 if pretty else None)
+            nl = b"\n" if pretty else b""
+            colon = b": " if pretty else b":"
+            with open(out_path, "wb") as f:
+                f.write(b"{" + nl + b'"export"' + colon + _json_bytes(export_meta, pretty) + b"," + nl + b'"tables"' + colon + b"{" + nl)
+                for i, table in enumerate(_EXPORT_TABLES):
+                    cols, batches = _iter_table(conn, table)
+                    if i:
+                        f.write(b"," + nl)
+                    f.write(_json_bytes(table, pretty) + colon)
+                    _write_json_array(f, cols, batches, pretty, scratch)
+                f.write(nl + b"}" + nl + b"}")
             return out_path
         else:
             # Multiple JSONs packaged into a ZIP
-            with ZipFile(out_path, "w", compression=ZIP_DEFLATED) as zf:
+            with ZipFile(out_path, "w", compression=ZIP_DEFLATED, compresslevel=_ZIP_LEVEL) as zf:
                 manifest = {
                     "app": "Finance Tool",
                     "timestamp": ts,
-                    "source_db": os.path.abspath(db_path),
+                    "source_db": abs_db,
                     "format": "per-table-json",
                     "tables": list(_EXPORT_TABLES),
                 }
-                zf.writestr(
-                    "manifest.json",
-                    json.dumps(manifest, ensure_ascii=False, indent=2 if pretty else None)
-                )
+                zf.writestr("manifest.json", _json_bytes(manifest, pretty), compress_type=ZIP_STORED)
 
                 for table in _EXPORT_TABLES:
-                    cols, rows = _fetch_table(conn, table)
-                    data = _rows_to_dicts(cols, rows) if cols else []
-                    zf.writestr(
-                        f"{table}.json",
-                        json.dumps(data, ensure_ascii=False, indent=2 if pretty else None)
-                    )
+                    cols, batches = _iter_table(conn, table)
+                    with zf.open(f"{table}.json", "w") as entry:
+                        _write_json_array(entry, cols, batches, pretty, scratch)
             return out_path
 
+def export_all_to_sql(
+    db_path: str = "budget_tracker.db",
+    out_path: Optional[str] = None,
+    compress: bool = False,
+) -> str:
+    """
+    Export the entire database as an SQL text dump (schema + INSERTs), as
+    produced by sqlite3's `Connection.iterdump()`.
+
+    Fast backup path: statements are streamed straight to disk without
+    building per-row Python objects, and the dump can be replayed with
+    `executescript` or the sqlite3 shell. import_all_from_path does not read
+    dumps; replay one into a new .db and import that instead.
+
+    - If compress=True: the dump is streamed through multi-threaded zstd
+      (level 3) into a `.sql.zst` file, usually far smaller than a .db copy.
+      Requires the `zstandard` package (listed in requirements.txt).
+
+    Returns the path to the created .sql / .sql.zst file.
+    """
+    if compress and zstandard is None:
+        raise RuntimeError("compress=True requires the 'zstandard' package.")
+
+    ts = _ts()
+    if out_path is None:
+        out_path = f"export_all_{ts}.sql.zst" if compress else f"export_all_{ts}.sql"
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+
+    with _export_connection(db_path) as conn:
+        if not compress:
+            with open(out_path, "w", encoding="utf-8") as f:
+                f.writelines(f"{line}\n" for line in conn.iterdump())
+        else:
+            cctx = zstandard.ZstdCompressor(level=3, threads=-1)
+            with open(out_path, "wb") as f, cctx.stream_writer(f) as zw, \
+                    io.TextIOWrapper(zw, encoding="utf-8") as txt:
+                txt.writelines(f"{line}\n" for line in conn.iterdump())
+    return out_path
+
 def export_all_to_db(
     db_path: str = "budget_tracker.db",
     out_path: Optional[str] = None,
@@ -187,19 +310,22 @@ def export_all_to_db(
     Export/backup the entire SQLite database to a new `.db` file.
 
     Strategy:
-      1) Prefer `VACUUM INTO` (creates a compact, consistent copy) if supported.
-      2) Fallback to sqlite3 backup API (src.backup(dst)) for broader compatibility.
+      Copy with the sqlite3 online backup API, _BACKUP_PAGES pages per step,
+      so the source lock is released between steps and the app keeps writing
+      during long backups. With compact=True the copy is then VACUUMed in
+      place, which touches only the new file.
 
     Args:
         db_path:      Path to the current working database.
         out_path:     Destination path for the exported .db. If None, uses a timestamped name.
         overwrite:    If False and out_path exists, raises FileExistsError.
-        compact:      If True, try VACUUM INTO first (more compact). Otherwise go straight to backup.
+        compact:      If True, VACUUM the copy after the backup (smaller file).
 
     Returns:
         The final path of the exported .db.
     """
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    ts = _ts()
+    abs_db = os.path.abspath(db_path)
     if out_path is None:
         base = os.path.splitext(os.path.basename(db_path))[0] or "budget_tracker"
         out_path = f"{base}_export_{ts}.db"
@@ -208,37 +334,24 @@ def export_all_to_db(
     os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
 
     # Safety: don't clobber unless allowed
-    if os.path.abspath(db_path) == os.path.abspath(out_path):
+    abs_out = os.path.abspath(out_path)
+    if abs_db == abs_out:
         raise ValueError("out_path must be different from db_path.")
-    if os.path.exists(out_path) and not overwrite:
+    if os.path.exists(abs_out) and not overwrite:
         raise FileExistsError(f"Destination already exists: {out_path}")
 
-    # Try VACUUM INTO for a compact copy (SQLite 3.27+)
-    if compact:
-        try:
-            with get_connection(db_path) as conn:
-                # Need to quote/escape the path for SQL string
-                dest = out_path.replace("'", "''")
-                conn.execute(f"VACUUM INTO '{dest}'")
-                return out_path
-        except Exception as e:
-            # Fall back to backup below
-            print("[export] VACUUM INTO failed; falling back to backup():", e)
-
-    # Fallback: use sqlite3 backup API (works on older SQLite versions)
-    src = None
-    dst = None
+    # Ensure destination is new/empty
+    if os.path.exists(abs_out):
+        os.remove(abs_out)
+
+    src = get_connection(db_path)  # cached app connection; not closed here
+    dst = sqlite3.connect(abs_out)
     try:
-        src = sqlite3.connect(db_path)
-        # Ensure destination is new/empty
-        if os.path.exists(out_path) and overwrite:
-            os.remove(out_path)
-        dst = sqlite3.connect(out_path)
-        with dst:
-            src.backup(dst)
+        src.backup(dst, pages=_BACKUP_PAGES)
+        # The copy inherits WAL from the source; make it a self-contained file
+        dst.execute("PRAGMA journal_mode = DELETE")
+        if compact:
+            dst.execute("VACUUM")
         return out_path
     finally:
-        if src:
-            src.close()
-        if dst:
-            dst.close()
+        dst.close()
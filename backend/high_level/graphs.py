@@ -1,24 +1,28 @@
 # ─── Standard Library ────────────────────────────────────────────────────────
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from calendar import monthrange
 from collections import defaultdict
-from statistics import mean
-from typing import Dict, List, Tuple
+from functools import lru_cache
+from operator import itemgetter
+import heapq
+from typing import Dict, Optional, Tuple
+import math
+import re
 
 # ─── Third-Party Libraries ──────────────────────────────────────────────────
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
-import matplotlib as mpl
+from matplotlib import rcParams
 from matplotlib.figure import Figure
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
+from matplotlib.colors import LinearSegmentedColormap, Normalize
 import calendar
-from statistics import stdev
-import plotly.graph_objects as go
 from dateutil.relativedelta import relativedelta
-import pandas as pd
+# pandas is imported inside the few functions that use it
+from PySide6.QtCore import Qt, QEvent, QTimer, QPointF, QRectF, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QColor, QImage, QPainter, QPainterPath, QPen
 from PySide6.QtWidgets import (
-    QWidget,QHeaderView,
+    QWidget, QHeaderView, QTableView, QVBoxLayout, QLabel, QSizePolicy, QToolTip,
 )
 
 try:
@@ -27,10 +31,574 @@ except ImportError:
     from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 
 # ─── Internal Project Imports ───────────────────────────────────────────────
-from backend.db import get_connection
-from backend.crud.expenses import get_all_expenses 
-from backend.crud.categories import get_all_categories,get_all_categories_full
-from backend.high_level.analysis import calc_networth, filter_expenses_by_toggle, get_avg_monthly_expense, weekly_expenses
+from backend.db import get_connection, data_stamp
+from backend.crud.categories import get_all_categories, get_category_ids_by_type
+from backend.high_level.analysis import (
+    calc_networth, get_avg_monthly_expense, weekly_expenses,
+)
+
+# ─────────────────────────────
+# 🧮 EXPENSE ARRAYS
+# ─────────────────────────────
+
+# Column arrays over every expense joined to its category, rebuilt when
+# db.data_stamp() changes; "rows" memoizes _toggle_rows() masks per toggle
+# for the current arrays, so the dashboard's tiles share one filter pass
+_EXPENSE_ARRAYS: Dict[str, object] = {"stamp": None, "arrays": None, "rows": {}}
+
+_EXPENSE_JOIN_SQL = """
+    SELECT e.category_id, e.cost, e.date, e.wallet_id, c.name, c.limit_amount, c.type
+    FROM expense e
+    LEFT JOIN category c ON c.id = e.category_id
+    ORDER BY e.id
+"""
+
+def _ymd_key(value) -> int:
+    """'YYYY-MM-DD...' -> YYYYMMDD as an int; -1 when the value isn't such a date."""
+    s = str(value)
+    if len(s) < 10 or s[4] != "-" or s[7] != "-":
+        return -1
+    try:
+        return int(s[:4]) * 10000 + int(s[5:7]) * 100 + int(s[8:10])
+    except ValueError:
+        return -1
+
+def _expense_arrays() -> Dict[str, np.ndarray]:
+    """
+    Every expense with its category (one LEFT JOIN, ordered by id) as
+    column arrays, parsed once:
+    - cat_id / wallet_id: int64, -1 where NULL
+    - cost: float64, NaN where not a number
+    - ymd: int64 YYYYMMDD (ymd // 100 is YYYYMM), -1 where not a date
+    - cat_name: object, "Unknown" where the expense has no category
+    - cat_limit: float64, NaN where unset or not a number
+    - cat_type: int64, -1 where the expense has no category
+    """
+    stamp = data_stamp()
+    if _EXPENSE_ARRAYS["stamp"] != stamp:
+        with get_connection() as conn:
+            rows = conn.execute(_EXPENSE_JOIN_SQL).fetchall()
+        n = len(rows)
+
+        def ids(i: int) -> np.ndarray:
+            return np.fromiter((r[i] if isinstance(r[i], int) else -1 for r in rows), dtype=np.int64, count=n)
+
+        def numbers(i: int) -> np.ndarray:
+            import pandas as pd
+            return pd.to_numeric(pd.Series([r[i] for r in rows], dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+
+        cat_name = np.empty(n, dtype=object)
+        cat_name[:] = [r[4] if r[4] is not None else "Unknown" for r in rows]
+        _EXPENSE_ARRAYS["arrays"] = {
+            "cat_id": ids(0),
+            "cost": numbers(1),
+            "ymd": np.fromiter((_ymd_key(r[2]) for r in rows), dtype=np.int64, count=n),
+            "wallet_id": ids(3),
+            "cat_name": cat_name,
+            "cat_limit": numbers(5),
+            "cat_type": ids(6),
+        }
+        _EXPENSE_ARRAYS["rows"] = {}
+        _EXPENSE_ARRAYS["stamp"] = stamp
+    return _EXPENSE_ARRAYS["arrays"]
+
+def _category_limits(categories) -> Dict[int, float]:
+    """Category id -> monthly limit as a float; NaN where unset or not a number."""
+    import pandas as pd
+    limits = pd.to_numeric(pd.Series([cat[2] for cat in categories], dtype=object), errors="coerce")
+    return dict(zip([cat[0] for cat in categories], limits.tolist()))
+
+def _toggle_rows(arr: Dict[str, np.ndarray], toggle_state: int = 0) -> np.ndarray:
+    """
+    Row mask over _expense_arrays(): a numeric cost, and for toggle_state=1 a
+    variable (type 0) category, as filter_expenses_by_toggle. Read-only; it is
+    shared until the arrays are rebuilt.
+    """
+    cached = _EXPENSE_ARRAYS["rows"] if arr is _EXPENSE_ARRAYS["arrays"] else {}
+    mask = cached.get(toggle_state)
+    if mask is None:
+        mask = ~np.isnan(arr["cost"])
+        if toggle_state != 0:
+            mask &= arr["cat_type"] == 0
+        mask.flags.writeable = False
+        cached[toggle_state] = mask
+    return mask
+
+def _category_totals(start_date: str, end_date: str, toggle_state: int = 0) -> Dict[str, float]:
+    """
+    Spent per category name for expenses dated start_date..end_date
+    ('YYYY-MM-DD', both inclusive), in first-seen order; "Unknown" collects
+    expenses without a category. SQLite sums only the rows in range, found
+    through idx_expense_date.
+    """
+    # Exclusive upper bound, so dates carrying a time part still match their day
+    until = (date.fromisoformat(end_date) + timedelta(days=1)).isoformat()
+    toggle_sql = " AND c.type = 0" if toggle_state != 0 else ""
+    with get_connection() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT COALESCE(c.name, 'Unknown'), SUM(e.cost)
+            FROM expense e
+            LEFT JOIN category c ON c.id = e.category_id
+            WHERE e.date >= ? AND e.date < ?{toggle_sql}
+            GROUP BY 1
+            ORDER BY MIN(e.id)
+            """,
+            (start_date, until)
+        ).fetchall()
+    return {name: float(total) for name, total in rows}
+
+# ─────────────────────────────
+# 🎨 CATEGORY COLOURS
+# ─────────────────────────────
+
+# Fixed colour per default category (names must match your DB)
+_CAT_COLORS = {
+    "Coffee":              "#6F4E37",
+    "Clothes":             "#8E44AD",
+    "Extra":               "#90A4AE",
+    "Going out":           "#C2185B",
+    "Health Care":         "#00897B",
+    "Home":                "#8D6E63",
+    "Memberships":         "#7B1FA2",
+    "Personal Projects":   "#3949AB",
+    "Pharmacy":            "#26A69A",
+    "Rent":                "#455A64",
+    "Restaurant":          "#2E7D32",
+    "Shopping":            "#EC407A",
+    "Sport":               "#FB8C00",
+    "Trasport":            "#00ACC1",
+    "Travel":              "#1E88E5",
+    "University Payment":  "#D32F2F",
+    "Groceries":           "#4CAF50",
+}
+
+# Matplotlib's "tab20" colours, for pie slices without a fixed colour
+_TAB20 = (
+    "#1f77b4", "#aec7e8", "#ff7f0e", "#ffbb78", "#2ca02c", "#98df8a", "#d62728",
+    "#ff9896", "#9467bd", "#c5b0d5", "#8c564b", "#c49c94", "#e377c2", "#f7b6d2",
+    "#7f7f7f", "#c7c7c7", "#bcbd22", "#dbdb8d", "#17becf", "#9edae5",
+)
+
+@lru_cache(maxsize=16)
+def _slice_colors(labels: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Pie colour per label: its fixed colour, else tab20 by position."""
+    return tuple(_CAT_COLORS.get(label, _TAB20[i % len(_TAB20)]) for i, label in enumerate(labels))
+
+# ─────────────────────────────
+# 🖼️ CANVAS
+# ─────────────────────────────
+
+def _hex(c) -> str:
+    """QColor -> '#rrggbb'; colour strings pass through."""
+    try:
+        return c.name()
+    except Exception:
+        return str(c)
+
+# id(theme) -> (theme, palette); themes are long-lived module-level objects
+_PALETTES: Dict[int, Tuple[object, Dict[str, str]]] = {}
+
+def _theme_palette() -> Optional[Dict[str, str]]:
+    """
+    The current theme's colours as hex strings (plus 'variant' and
+    'PLUM_DARK'), resolved once per theme. None when frontend.theme is
+    unavailable, so callers fall back to their own constants.
+    """
+    try:
+        from frontend.theme import current_theme
+        t = current_theme()
+    except Exception:
+        return None
+    hit = _PALETTES.get(id(t))
+    if hit is None or hit[0] is not t:
+        palette = {name: _hex(value) for name, value in vars(t).items()
+                   if isinstance(value, str) or hasattr(value, "name")}
+        palette["variant"] = getattr(t, "variant", "dark")
+        try:
+            palette["PLUM_DARK"] = t.PLUM.darker(220).name()
+        except Exception:
+            pass
+        hit = _PALETTES[id(t)] = (t, palette)
+    return hit[1]
+
+_RESIZE_DEBOUNCE_MS = 50
+
+class _ResizeDebouncedCanvas(FigureCanvas):
+    """
+    FigureCanvas that re-renders once a resize settles instead of on every
+    step of a drag. Until the first draw it behaves like a plain canvas.
+    """
+    def __init__(self, figure):
+        super().__init__(figure)
+        self._in_resize = False
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(_RESIZE_DEBOUNCE_MS)
+        self._resize_timer.timeout.connect(self.draw_idle)
+
+    def resizeEvent(self, event):
+        if not hasattr(self, "renderer"):
+            super().resizeEvent(event)
+            return
+        self._in_resize = True
+        try:
+            super().resizeEvent(event)
+        finally:
+            self._in_resize = False
+        self._resize_timer.start()
+
+    def draw_idle(self):
+        # Redraws requested from inside resizeEvent wait for the timer
+        if not self._in_resize:
+            super().draw_idle()
+
+    def paintEvent(self, event):
+        if not self._resize_timer.isActive():
+            super().paintEvent(event)
+            return
+        # Mid-drag the Agg buffer still has the old size: stretch it to fit
+        buf = self.renderer.buffer_rgba()
+        image = QImage(buf, buf.shape[1], buf.shape[0], QImage.Format.Format_RGBA8888)
+        painter = QPainter(self)
+        try:
+            painter.eraseRect(self.rect())
+            painter.drawImage(self.rect(), image)
+        finally:
+            painter.end()
+
+def _finalize_canvas(fig: Figure) -> _ResizeDebouncedCanvas:
+    """
+    Transparent, freely shrinkable canvas for a dashboard tile. The first
+    render is queued with draw_idle, so it coalesces with the draw the
+    initial resize requests instead of adding a second Agg pass.
+    """
+    canvas = _ResizeDebouncedCanvas(fig)
+    canvas.setStyleSheet("background: transparent;")
+    canvas.setMinimumSize(0, 0)
+    canvas.draw_idle()
+    return canvas
+
+class _RefreshableCanvas(_ResizeDebouncedCanvas):
+    """
+    Tile canvas that owns its Figure and single Axes for its whole life:
+    refresh() (defined by subclasses) swaps data into the existing artists
+    and queues a redraw, instead of the tile building a new canvas. Once
+    set_minimal is on (Insights mini tiles), refreshes leave titles, labels,
+    legend and margins as the tile styled them.
+    """
+    def __init__(self, figsize: Tuple[float, float]):
+        fig = Figure(figsize=figsize, dpi=100)
+        fig.patch.set_alpha(0.0)
+        super().__init__(fig)
+        self.ax = fig.add_subplot(111)
+        self.ax.set_facecolor("none")
+        self._minimal = False
+        self.setStyleSheet("background: transparent;")
+        self.setMinimumSize(0, 0)
+
+    def set_minimal(self, minimal: bool = True):
+        self._minimal = minimal
+
+    def _show_empty_frame(self):
+        # A fresh Figure's margins and no title/legend, so the empty-state
+        # message lands where it would on a newly built canvas
+        self.figure.subplots_adjust(**{k: rcParams[f"figure.subplot.{k}"] for k in ("left", "right", "bottom", "top")})
+        self.ax.set_title("")
+        leg = self.ax.get_legend()
+        if leg:
+            leg.remove()
+
+class _PieChartWidget(QWidget):
+    """
+    Pie with a percentage on each wedge, a legend and a title, painted
+    directly with QPainter (no Figure or Agg buffer). Wedges run
+    counter-clockwise from start_angle, as in Matplotlib's pie. Minimal mode
+    (Insights mini tiles) draws only the wedges on a transparent background.
+    """
+    def __init__(self, slices, title: str = "", empty_text: str = "", start_angle: float = 140.0, parent=None):
+        super().__init__(parent)
+        # slices: (label, value, colour) -> (label, QColor, start, span, percent)
+        total = sum(value for _, value, _ in slices)
+        if total <= 0:
+            slices = []
+        self._slices = []
+        angle = start_angle
+        for label, value, color in slices:
+            span = 360.0 * value / total
+            self._slices.append((label, QColor(color), angle, span, 100.0 * value / total))
+            angle += span
+        self._title = title
+        self._empty_text = empty_text
+        self._minimal = False
+        self._pie_rect = QRectF()
+        self._plot_rect = QRectF()
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setMinimumSize(0, 0)
+
+    def set_minimal(self, minimal: bool = True):
+        self._minimal = minimal
+        self._fit()
+        self.update()
+
+    def _fit(self):
+        # Same margins as the Figure layouts this replaces (subplots_adjust)
+        w, h = self.width(), self.height()
+        if self._minimal:
+            self._plot_rect = QRectF(0.06 * w, 0.10 * h, 0.88 * w, 0.80 * h)
+        else:
+            self._plot_rect = QRectF(0.08 * w, 0.12 * h, 0.60 * w, 0.78 * h)
+        d = 0.8 * min(self._plot_rect.width(), self._plot_rect.height())
+        self._pie_rect = QRectF(0, 0, d, d)
+        self._pie_rect.moveCenter(self._plot_rect.center())
+
+    def resizeEvent(self, event):
+        self._fit()
+        super().resizeEvent(event)
+
+    def _font(self, point_size: float):
+        font = self.font()
+        font.setPointSizeF(point_size)
+        return font
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        try:
+            painter.setRenderHint(QPainter.Antialiasing, True)
+            if not self._minimal:
+                painter.fillRect(self.rect(), QColor("#000000"))
+            if not self._slices:
+                if not self._minimal:
+                    painter.setPen(QColor("#BBBBBB"))
+                    painter.setFont(self._font(12))
+                    painter.drawText(self.rect(), Qt.AlignCenter, self._empty_text)
+                return
+            self._paint_wedges(painter)
+            if not self._minimal:
+                self._paint_percentages(painter)
+                self._paint_legend(painter)
+                painter.setPen(QColor("#FFFFFF"))
+                painter.setFont(self._font(13))
+                title_rect = QRectF(self._plot_rect.left(), 0, self._plot_rect.width(), self._plot_rect.top() - 4)
+                painter.drawText(title_rect, Qt.AlignHCenter | Qt.AlignBottom, self._title)
+        finally:
+            painter.end()
+
+    def _paint_wedges(self, painter: QPainter):
+        painter.setPen(QPen(QColor("#FFFFFF"), 1.0))
+        for _, color, start, span, _ in self._slices:
+            # Qt angles are 1/16°; round both edges so neighbours share them
+            a0, a1 = round(start * 16), round((start + span) * 16)
+            painter.setBrush(color)
+            painter.drawPie(self._pie_rect, a0, a1 - a0)
+
+    def _paint_percentages(self, painter: QPainter):
+        painter.setPen(QColor("#FFFFFF"))
+        painter.setFont(self._font(9))
+        center, r = self._pie_rect.center(), 0.7 * self._pie_rect.width() / 2
+        for _, _, start, span, pct in self._slices:
+            mid = math.radians(start + span / 2)
+            at = QPointF(center.x() + r * math.cos(mid), center.y() - r * math.sin(mid))
+            painter.drawText(QRectF(at.x() - 40, at.y() - 10, 80, 20), Qt.AlignCenter, f"{pct:.1f}%")
+
+    def _paint_legend(self, painter: QPainter):
+        row_h, swatch, pad = 18.0, 12.0, 6.0
+        title_font, item_font = self._font(10), self._font(9)
+        painter.setFont(item_font)
+        text_w = max(painter.fontMetrics().horizontalAdvance(label) for label, *_ in self._slices)
+        painter.setFont(title_font)
+        text_w = max(text_w, painter.fontMetrics().horizontalAdvance("Categories") - swatch - pad)
+
+        box = QRectF(0, 0, pad * 3 + swatch + text_w, pad * 2 + row_h * (len(self._slices) + 1))
+        box.moveLeft(self._plot_rect.right() + 0.02 * self._plot_rect.width())
+        box.moveTop(self._plot_rect.center().y() - box.height() / 2)
+        painter.setPen(QColor("#444444"))
+        painter.setBrush(QColor("#000000"))
+        painter.drawRect(box)
+
+        painter.setPen(QColor("#FFFFFF"))
+        painter.drawText(QRectF(box.left(), box.top() + pad, box.width(), row_h), Qt.AlignCenter, "Categories")
+        painter.setFont(item_font)
+        for i, (label, color, *_) in enumerate(self._slices, start=1):
+            top = box.top() + pad + i * row_h
+            painter.fillRect(QRectF(box.left() + pad, top + (row_h - swatch) / 2, swatch, swatch), color)
+            painter.drawText(QRectF(box.left() + pad * 2 + swatch, top, text_w + pad, row_h),
+                             Qt.AlignLeft | Qt.AlignVCenter, label)
+
+class _SankeyWidget(QWidget):
+    """
+    Sankey diagram painted with QPainter: nodes are columns of bars (column =
+    distance from a source node), links are bezier ribbons whose height is
+    proportional to their value. Zero-value links and nodes are not drawn.
+    Layout is recomputed on resize only; hovering shows node/link values.
+    """
+    _PAD, _THICKNESS, _MARGIN = 14.0, 16.0, 6.0
+
+    def __init__(self, labels, sources, targets, values, node_colors, link_colors, title: str = "", parent=None):
+        super().__init__(parent)
+        self._labels = list(labels)
+        self._node_colors = [QColor(c) for c in node_colors]
+        self._links = [
+            (s, t, float(v), QColor(c))
+            for s, t, v, c in zip(sources, targets, values, link_colors) if v > 0
+        ]
+        n = len(self._labels)
+        out_sum, in_sum = [0.0] * n, [0.0] * n
+        for s, t, v, _ in self._links:
+            out_sum[s] += v
+            in_sum[t] += v
+        self._node_values = [max(o, i) for o, i in zip(out_sum, in_sum)]
+        # Longest path from a source; links form a DAG, so n passes suffice
+        self._depth = [0] * n
+        for _ in range(n):
+            for s, t, _, _ in self._links:
+                self._depth[t] = max(self._depth[t], self._depth[s] + 1)
+        self._title = title
+        self._node_rects: Dict[int, QRectF] = {}
+        self._link_paths = []
+        self.setAttribute(Qt.WA_TranslucentBackground, True)
+        self.setStyleSheet("background: transparent;")
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setMinimumSize(0, 0)
+
+    def _font(self, pixel_size: int):
+        font = self.font()
+        font.setPixelSize(pixel_size)
+        return font
+
+    def _fit(self):
+        m = self._MARGIN
+        top = 26.0 if self._title else 4.0
+        inner = QRectF(m, top, max(self.width() - 2 * m, 1.0), max(self.height() - top - m, 1.0))
+
+        columns: Dict[int, list] = defaultdict(list)
+        for i, v in enumerate(self._node_values):
+            if v > 0:
+                columns[self._depth[i]].append(i)
+        self._node_rects, self._link_paths = {}, []
+        if not columns:
+            return
+
+        # One value->pixels scale for every column, fitted to the fullest one
+        ky = min(
+            (inner.height() - self._PAD * (len(ids) - 1)) / sum(self._node_values[i] for i in ids)
+            for ids in columns.values()
+        )
+        ky = max(ky, 0.0)
+        last = max(columns)
+        step = (inner.width() - self._THICKNESS) / last if last else 0.0
+        for d, ids in columns.items():
+            total = sum(self._node_values[i] for i in ids) * ky + self._PAD * (len(ids) - 1)
+            y = inner.top() + (inner.height() - total) / 2
+            for i in ids:
+                h = self._node_values[i] * ky
+                self._node_rects[i] = QRectF(inner.left() + d * step, y, self._THICKNESS, h)
+                y += h + self._PAD
+
+        # Ribbons leave each source and enter each target in the other end's vertical order
+        out_y = {i: r.top() for i, r in self._node_rects.items()}
+        in_y = dict(out_y)
+        src_offset, tgt_offset = {}, {}
+        for k in sorted(range(len(self._links)), key=lambda k: self._node_rects[self._links[k][1]].top()):
+            s, _, v, _ = self._links[k]
+            src_offset[k] = out_y[s]
+            out_y[s] += v * ky
+        for k in sorted(range(len(self._links)), key=lambda k: self._node_rects[self._links[k][0]].top()):
+            _, t, v, _ = self._links[k]
+            tgt_offset[k] = in_y[t]
+            in_y[t] += v * ky
+        for k, (s, t, v, color) in enumerate(self._links):
+            x0, x1 = self._node_rects[s].right(), self._node_rects[t].left()
+            y0, y1, h = src_offset[k], tgt_offset[k], v * ky
+            xm = (x0 + x1) / 2
+            path = QPainterPath(QPointF(x0, y0))
+            path.cubicTo(xm, y0, xm, y1, x1, y1)
+            path.lineTo(x1, y1 + h)
+            path.cubicTo(xm, y1 + h, xm, y0 + h, x0, y0 + h)
+            path.closeSubpath()
+            self._link_paths.append((path, color, f"{self._labels[s]} → {self._labels[t]}: {v:,.2f}"))
+
+    def resizeEvent(self, event):
+        self._fit()
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        try:
+            painter.setRenderHint(QPainter.Antialiasing, True)
+            if self._title:
+                painter.setPen(QColor("#FFFFFF"))
+                painter.setFont(self._font(14))
+                painter.drawText(QRectF(self._MARGIN, 0, self.width() - 2 * self._MARGIN, 24),
+                                 Qt.AlignLeft | Qt.AlignVCenter, self._title)
+            painter.setPen(Qt.NoPen)
+            for path, color, _ in self._link_paths:
+                painter.fillPath(path, color)
+
+            painter.setPen(QPen(QColor(255, 255, 255, 31), 0.6))
+            for i, rect in self._node_rects.items():
+                painter.setBrush(self._node_colors[i])
+                painter.drawRect(rect)
+
+            # Labels beside each node, inward for the last column
+            painter.setPen(QColor("#E8ECF6"))
+            painter.setFont(self._font(12))
+            last = max((self._depth[i] for i in self._node_rects), default=0)
+            for i, rect in self._node_rects.items():
+                mid = rect.center().y()
+                if self._depth[i] == last and last > 0:
+                    box = QRectF(0, mid - 10, rect.left() - 6, 20)
+                    align = Qt.AlignRight | Qt.AlignVCenter
+                else:
+                    box = QRectF(rect.right() + 6, mid - 10, self.width() - rect.right() - 6, 20)
+                    align = Qt.AlignLeft | Qt.AlignVCenter
+                painter.drawText(box, align, self._labels[i])
+        finally:
+            painter.end()
+
+    def event(self, event):
+        if event.type() == QEvent.ToolTip:
+            pos = QPointF(event.pos())
+            text = next((f"{self._labels[i]}: {self._node_values[i]:,.2f}"
+                         for i, r in self._node_rects.items() if r.contains(pos)), None)
+            if text is None:
+                text = next((tip for path, _, tip in reversed(self._link_paths) if path.contains(pos)), None)
+            if text is None:
+                QToolTip.hideText()
+            else:
+                QToolTip.showText(event.globalPos(), text, self)
+            return True
+        return super().event(event)
+
+class _CatSumModel(QAbstractTableModel):
+    """Read-only (category, total) rows for cat_sum_table_qt; no per-cell items."""
+
+    _HEADERS = ("Category", "Total Spent")
+
+    def __init__(self, rows, parent=None):
+        super().__init__(parent)
+        self._rows = list(rows)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 2
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        cat, total = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return cat if index.column() == 0 else f"{total:.2f}"
+        if role == Qt.TextAlignmentRole and index.column() == 1:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self._HEADERS[section]
+        return None
 
 # ─────────────────────────────
 # 🗂️ CATEGORY FUNCTIONS
@@ -47,49 +615,27 @@ def cat_volatility_qt(toggle_state: int = 0):
     - Uses a single accent color for all bars (theme.ACCENT_BLUE)
     - Falls back to dark-friendly defaults if theme is unavailable
     """
-    from collections import defaultdict
-    from statistics import stdev, mean
-    from matplotlib.figure import Figure
-    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-
     # ---- Fetch & filter data (behavior unchanged) ----
-    expenses = get_all_expenses()
-    categories = get_all_categories()
-    filtered_expenses = filter_expenses_by_toggle(expenses, categories, toggle_state)
+    arr = _expense_arrays()
+    keep = _toggle_rows(arr, toggle_state)
 
-    cat_name_map = {cat[0]: cat[1] for cat in categories}
-
-    cost_per_category: dict[str, list[float]] = defaultdict(list)
-    for exp in filtered_expenses:
-        try:
-            category_id = exp[2]
-            cost = float(exp[3])
-            cat_name = cat_name_map.get(category_id, "Unknown")
-            cost_per_category[cat_name].append(cost)
-        except (TypeError, ValueError):
-            continue
+    # One entry per expense with a numeric cost
+    names = arr["cat_name"][keep]
+    costs = arr["cost"][keep]
 
     # ---- THEME (non-breaking) ----
-    def _hex(c):
-        try:
-            return c.name()
-        except Exception:
-            return str(c)
-
-    try:
-        from frontend.theme import current_theme  # optional
-        t = current_theme()
-        variant = getattr(t, "variant", "dark")
-        TEXT = _hex(getattr(t, "TEXT", "#E8ECF6"))
-        TICK = _hex(getattr(t, "TICK", "#B8C1D9"))
-        BAR  = _hex(getattr(t, "ACCENT_BLUE", "#2F6BCE"))
-        if variant == "light":
+    pal = _theme_palette()
+    if pal is not None:
+        TEXT = pal.get("TEXT", "#E8ECF6")
+        TICK = pal.get("TICK", "#B8C1D9")
+        BAR  = pal.get("ACCENT_BLUE", "#2F6BCE")
+        if pal["variant"] == "light":
             SPINE = (0, 0, 0, 0.25)
             GRID  = (0, 0, 0, 0.10)
         else:
             SPINE = (1, 1, 1, 0.18)
             GRID  = (1, 1, 1, 0.06)
-    except Exception:
+    else:
         # Fallbacks
         TEXT  = "#E8ECF6"
         TICK  = "#B8C1D9"
@@ -103,43 +649,40 @@ def cat_volatility_qt(toggle_state: int = 0):
     ax = fig.add_subplot(111)
     ax.set_facecolor("none")
 
-    if not cost_per_category:
+    if not len(costs):
         ax.text(0.5, 0.5, "No data available.", ha="center", va="center",
                 fontsize=12, color=TEXT)
         ax.set_axis_off()
-        canvas = FigureCanvas(fig)
-        canvas.setStyleSheet("background: transparent;")
-        canvas.setMinimumSize(0, 0)
-        return canvas
-
-    # ---- Compute SD & mean per category (unchanged) ----
-    volatility_per_category: dict[str, float] = {}
-    mean_per_category: dict[str, float] = {}
-    for cat, costs in cost_per_category.items():
-        if len(costs) > 1:
-            volatility_per_category[cat] = round(stdev(costs), 2)
-        else:
-            volatility_per_category[cat] = 0.0
-        mean_per_category[cat] = round(mean(costs), 2)
-
-    # Sort by volatility descending (unchanged)
-    sorted_cats = sorted(volatility_per_category.items(), key=lambda x: x[1], reverse=True)
-    labels = [c for c, _ in sorted_cats]
-    sd_values = [volatility_per_category[c] for c in labels]
-    mean_values = [mean_per_category[c] for c in labels]
-    x_positions = list(range(len(labels)))
+        return _finalize_canvas(fig)
+
+    # ---- Compute SD & mean per category (sample SD; single expense -> 0) ----
+    uniq, first_idx, group = np.unique(names, return_index=True, return_inverse=True)
+    counts = np.bincount(group)
+    # Exact (fsum) group sums, so means round to the cent like statistics.mean did
+    by_group = np.split(costs[np.argsort(group, kind="stable")], np.cumsum(counts)[:-1])
+    means = np.array([math.fsum(g) for g in by_group]) / counts
+    sq_dev = np.bincount(group, weights=(costs - means[group]) ** 2)
+    sds = np.sqrt(sq_dev / np.maximum(counts - 1, 1), where=counts > 1, out=np.zeros(len(counts)))
+
+    # Sort by volatility descending; ties keep first-seen order
+    rounded_sd = np.array([round(v, 2) for v in sds.tolist()])
+    by_first_seen = np.argsort(first_idx)
+    order = by_first_seen[np.argsort(-rounded_sd[by_first_seen], kind="stable")]
+    labels = uniq[order].tolist()
+    sd_values = rounded_sd[order]
+    mean_values = [round(v, 2) for v in means[order].tolist()]
+    x_positions = np.arange(len(labels), dtype=np.float64)
 
     # Layout room for rotated labels
     fig.subplots_adjust(left=0.10, right=0.98, top=0.88, bottom=0.30)
 
     # Bars (single theme accent color)
-    bars = ax.bar(x_positions, sd_values, color=BAR, edgecolor="none")
+    ax.bar(x_positions, sd_values, color=BAR, edgecolor="none")
 
     # Mean annotations (styled via theme)
-    offset = 0.02 * max(sd_values, default=1)
-    for x, bar, m in zip(x_positions, bars, mean_values):
-        h = bar.get_height()
-        ax.text(x, h + offset, f"€{m}", ha="center", va="bottom",
+    offset = 0.02 * (sd_values.max() if len(sd_values) else 1)
+    for x, h, m in zip(x_positions.tolist(), (sd_values + offset).tolist(), mean_values):
+        ax.text(x, h, f"€{m}", ha="center", va="bottom",
                 fontsize=9, color=TEXT)
 
     # Axes & styling
@@ -156,10 +699,7 @@ def cat_volatility_qt(toggle_state: int = 0):
     ax.grid(True, axis="y", color=GRID, linewidth=1.0)
     ax.margins(x=0.01)
 
-    canvas = FigureCanvas(fig)
-    canvas.setStyleSheet("background: transparent;")
-    canvas.setMinimumSize(0, 0)
-    return canvas
+    return _finalize_canvas(fig)
 
 def bar_graph_qt(toggle_state: int = 0, month_key: int = 0):
     """
@@ -172,11 +712,6 @@ def bar_graph_qt(toggle_state: int = 0, month_key: int = 0):
     - Reads palette from frontend.theme.current_theme() when available
     - Falls back to original dark-friendly constants otherwise
     """
-    from datetime import datetime, timedelta
-    from collections import defaultdict
-    from matplotlib.figure import Figure
-    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-
     # Determine target month (unchanged)
     today = datetime.today()
     if month_key == 1:
@@ -185,56 +720,41 @@ def bar_graph_qt(toggle_state: int = 0, month_key: int = 0):
     else:
         target_date = today
 
-    month_str = f"{target_date.month:02d}"
-    year_str = str(target_date.year)
-    prefix = f"{year_str}-{month_str}"
+    target_ym = target_date.year * 100 + target_date.month
 
-    # Data (unchanged)
-    expenses = get_all_expenses()
+    # Data: integer month match on the preparsed columns
+    arr = _expense_arrays()
     categories = get_all_categories()
-    filtered_expenses = filter_expenses_by_toggle(expenses, categories, toggle_state)
-
-    cat_name_limit = {cat[0]: (cat[1], cat[2]) for cat in categories}
-    cat_type_map   = {cat[0]: cat[3] for cat in categories}
+    limit_values = _category_limits(categories)
 
-    totals_per_category = defaultdict(float)
-    for exp in filtered_expenses:
-        exp_date = str(exp[4])  # YYYY-MM-DD
-        if exp_date.startswith(prefix):
-            cat_id = exp[2]
-            try:
-                totals_per_category[cat_id] += float(exp[3])
-            except (TypeError, ValueError):
-                continue
+    in_month = (
+        (arr["ymd"] // 100 == target_ym)
+        & _toggle_rows(arr, toggle_state)
+    )
+    # Spent per category id, shifted by one so NULL (-1) lands in slot 0
+    cat_ids = arr["cat_id"][in_month] + 1
+    totals = np.zeros(max([int(cat[0]) for cat in categories] + [int(cat_ids.max(initial=0))]) + 2)
+    np.add.at(totals, cat_ids, arr["cost"][in_month])
 
+    # cat[0]=id, cat[1]=name, cat[2]=limit, cat[3]=type
     labels, spent, limits = [], [], []
-    for cat_id, (name, limit) in cat_name_limit.items():
+    for cat_id, name, limit, cat_type in (tuple(cat[:4]) for cat in categories):
         if limit is None:
             continue
-        if toggle_state == 1 and cat_type_map.get(cat_id) == 1:
+        if toggle_state == 1 and cat_type == 1:
             continue
         labels.append(name)
-        spent.append(totals_per_category.get(cat_id, 0.0))
-        try:
-            limits.append(float(limit))
-        except (TypeError, ValueError):
-            limits.append(0.0)
+        spent.append(float(totals[cat_id + 1]))
+        lim = limit_values[cat_id]
+        limits.append(0.0 if np.isnan(lim) else lim)
 
     # ---- THEME (non-breaking) ----
-    def _hex(c):
-        try:
-            return c.name()
-        except Exception:
-            return str(c)
-
-    try:
-        from frontend.theme import current_theme  # optional
-        t = current_theme()
-        variant = getattr(t, "variant", "dark")
-        TEXT  = _hex(getattr(t, "TEXT", "#E8ECF6"))
-        TICK  = _hex(getattr(t, "TICK", "#B8C1D9"))
-        BLUE  = _hex(getattr(t, "ACCENT_BLUE", "#2F6BCE"))
-        if variant == "light":
+    pal = _theme_palette()
+    if pal is not None:
+        TEXT  = pal.get("TEXT", "#E8ECF6")
+        TICK  = pal.get("TICK", "#B8C1D9")
+        BLUE  = pal.get("ACCENT_BLUE", "#2F6BCE")
+        if pal["variant"] == "light":
             SPINE       = (0, 0, 0, 0.25)
             GRID        = (0, 0, 0, 0.10)
             LIMIT_COLOR = (0, 0, 0, 0.20)  # soft black on light bg
@@ -243,7 +763,7 @@ def bar_graph_qt(toggle_state: int = 0, month_key: int = 0):
             GRID        = (1, 1, 1, 0.08)
             LIMIT_COLOR = (1, 1, 1, 0.20)  # soft white on dark bg
         SPENT_COLOR = BLUE
-    except Exception:
+    else:
         # Fallback to original constants
         TEXT        = "#E8ECF6"
         TICK        = "#B8C1D9"
@@ -262,18 +782,16 @@ def bar_graph_qt(toggle_state: int = 0, month_key: int = 0):
         ax.text(0.5, 0.5, "No data to display.", ha="center", va="center",
                 fontsize=12, color=TEXT)
         ax.set_axis_off()
-        canvas = FigureCanvas(fig)
-        canvas.setStyleSheet("background: transparent;")
-        canvas.setMinimumSize(0, 0)
-        return canvas
+        return _finalize_canvas(fig)
 
     # Plot (unchanged)
-    x = list(range(len(labels)))
+    # Positions and heights as float arrays, so Matplotlib needn't convert lists
+    x = np.arange(len(labels), dtype=np.float64)
     width = 0.36
 
-    ax.bar(x, limits, width=width, label="Limit",
+    ax.bar(x, np.asarray(limits, dtype=np.float64), width=width, label="Limit",
            color=LIMIT_COLOR, edgecolor="none")
-    ax.bar([i + width for i in x], spent, width=width, label="Spent",
+    ax.bar(x + width, np.asarray(spent, dtype=np.float64), width=width, label="Spent",
            color=SPENT_COLOR, edgecolor="none")
 
     ax.set_ylabel("Amount (€)", color=TEXT, fontsize=10)
@@ -282,7 +800,7 @@ def bar_graph_qt(toggle_state: int = 0, month_key: int = 0):
     ax.set_title(f"Spending vs Limit — {title_suffix} Month",
                  color=TEXT, fontsize=13, pad=8)
 
-    ax.set_xticks([i + width / 2 for i in x])
+    ax.set_xticks(x + width / 2)
     ax.set_xticklabels(labels, rotation=45, ha="right", color=TEXT, fontsize=9)
 
     # Legend styling
@@ -302,10 +820,7 @@ def bar_graph_qt(toggle_state: int = 0, month_key: int = 0):
 
     fig.subplots_adjust(left=0.10, right=0.98, top=0.88, bottom=0.30)
 
-    canvas = FigureCanvas(fig)
-    canvas.setStyleSheet("background: transparent;")
-    canvas.setMinimumSize(0, 0)
-    return canvas
+    return _finalize_canvas(fig)
 
 def over_under_qt(toggle_state: int = 0):
     """
@@ -317,31 +832,19 @@ def over_under_qt(toggle_state: int = 0):
     - Reads palette from frontend.theme.current_theme() when available
     - Falls back to original dark-friendly constants otherwise
     """
-    from collections import defaultdict
-    from matplotlib.figure import Figure
-    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-
     # ---- THEME (non-breaking) ----
-    def _hex(c):
-        try:
-            return c.name()
-        except Exception:
-            return str(c)
-
-    try:
-        from frontend.theme import current_theme  # optional
-        t = current_theme()
-        variant = getattr(t, "variant", "dark")
-        TEXT = _hex(getattr(t, "TEXT", "#E8ECF6"))
-        TICK = _hex(getattr(t, "TICK", "#B8C1D9"))
-        BAR  = _hex(getattr(t, "MAGENTA", "#B91D73"))
-        if variant == "light":
+    pal = _theme_palette()
+    if pal is not None:
+        TEXT = pal.get("TEXT", "#E8ECF6")
+        TICK = pal.get("TICK", "#B8C1D9")
+        BAR  = pal.get("MAGENTA", "#B91D73")
+        if pal["variant"] == "light":
             SPINE = (0, 0, 0, 0.25)
             GRID  = (0, 0, 0, 0.10)
         else:
             SPINE = (1, 1, 1, 0.18)
             GRID  = (1, 1, 1, 0.08)
-    except Exception:
+    else:
         # Fallback to previous hard-coded palette
         TEXT  = "#E8ECF6"          # light text
         TICK  = "#B8C1D9"          # softer ticks
@@ -350,34 +853,26 @@ def over_under_qt(toggle_state: int = 0):
         BAR   = "#B91D73"          # magenta
 
     # Fetch & filter data (backend behavior unchanged)
-    expenses = get_all_expenses()
-    categories = get_all_categories()
-    filtered_expenses = filter_expenses_by_toggle(expenses, categories, toggle_state)
-
-    # cat[0]=id, cat[1]=name, cat[2]=limit, cat[3]=type
-    cat_meta = {cat[0]: (cat[1], cat[2], cat[3]) for cat in categories}
-
-    # Sum monthly totals per (YYYY-MM, category_id)
-    monthly_totals = defaultdict(float)
-    for exp in filtered_expenses:
-        try:
-            cat_id = exp[2]
-            date_key = str(exp[4])[:7]  # YYYY-MM
-            amount = float(exp[3])
-        except (TypeError, ValueError):
-            continue
-        monthly_totals[(date_key, cat_id)] += amount
-
-    # Count months over limit per category name
+    arr = _expense_arrays()
+    keep = (arr["ymd"] >= 0) & _toggle_rows(arr, toggle_state)
+
+    # Sum monthly totals per (YYYYMM, category_id): one key per group, rows
+    # stably sorted so each group is contiguous and keeps its row order
+    cat_ids = arr["cat_id"][keep]
+    keys = (arr["ymd"][keep] // 100) * (1 << 32) + (cat_ids + 1)  # cat_id -1 (NULL) -> 0
+    order = np.argsort(keys, kind="stable")
+    _, starts = np.unique(keys[order], return_index=True)
+    totals = np.add.reduceat(arr["cost"][keep][order], starts) if len(starts) else np.empty(0)
+    first_row = np.flatnonzero(keep)[order[starts]]
+
+    # Every row of a group shares its category, so its first row carries the
+    # name and limit (NaN = no limit, so the comparison is False)
+    over = totals > arr["cat_limit"][first_row]
+
+    # Count months over limit per category name, in first-seen group order
     over_limit_counts = defaultdict(int)
-    for (month_key, cat_id), total in monthly_totals.items():
-        name, limit, _ = cat_meta.get(cat_id, ("Unknown", None, None))
-        try:
-            lim = float(limit) if limit is not None else None
-        except (TypeError, ValueError):
-            lim = None
-        if lim is not None and total > lim:
-            over_limit_counts[name] += 1
+    for name in arr["cat_name"][np.sort(first_row[over])].tolist():
+        over_limit_counts[name] += 1
 
     # Prepare figure/canvas (transparent for glass card)
     fig = Figure(figsize=(10, 6), dpi=100)
@@ -389,26 +884,22 @@ def over_under_qt(toggle_state: int = 0):
         ax.text(0.5, 0.5, "No over-limit spending detected.",
                 ha="center", va="center", fontsize=12, color=TEXT)
         ax.set_axis_off()
-        canvas = FigureCanvas(fig)
-        canvas.setStyleSheet("background: transparent;")
-        canvas.setMinimumSize(0, 0)
-        return canvas
+        return _finalize_canvas(fig)
 
     labels = list(over_limit_counts.keys())
-    counts = [int(over_limit_counts[k]) for k in labels]
-    x = list(range(len(labels)))
+    counts = np.fromiter(over_limit_counts.values(), dtype=np.float64, count=len(labels))
+    x = np.arange(len(labels), dtype=np.float64)
 
     # Leave space for rotated labels
     fig.subplots_adjust(left=0.10, right=0.98, top=0.88, bottom=0.30)
 
     # Bars
-    bars = ax.bar(x, counts, color=BAR, edgecolor="none")
+    ax.bar(x, counts, color=BAR, edgecolor="none")
 
     # Value labels above bars (small)
-    max_val = max(counts) if counts else 1
-    for xi, bar in zip(x, bars):
-        h = bar.get_height()
-        ax.text(xi, h + max(0.03 * max_val, 0.06), f"{int(h)}",
+    pad = max(0.03 * counts.max(), 0.06)
+    for xi, h in zip(x.tolist(), counts.tolist()):
+        ax.text(xi, h + pad, f"{int(h)}",
                 ha="center", va="bottom", fontsize=9, color=TEXT)
 
     # Axes & styling
@@ -425,14 +916,194 @@ def over_under_qt(toggle_state: int = 0):
     ax.grid(True, axis="y", color=GRID, linewidth=1.0)
     ax.margins(x=0.02)
 
-    canvas = FigureCanvas(fig)
-    canvas.setStyleSheet("background: transparent;")
-    canvas.setMinimumSize(0, 0)
-    return canvas
+    return _finalize_canvas(fig)
 
 # ─────────────────────────────
 # 💸 EXPENSE FUNCTIONS
 # ─────────────────────────────
+
+class _CumulativeCanvas(_RefreshableCanvas):
+    """
+    This month vs last month vs the 12-month average, as running totals (see
+    cumulative_expenditure_qt). All three curves are one LineCollection.
+    Minimal (overview tile) or full styling is fixed at construction.
+    """
+    def __init__(self, minimal: bool = True):
+        super().__init__((10, 4.6))
+        self._minimal = minimal
+        self._style = None
+        self._curves = LineCollection([], joinstyle="round", capstyle="projecting", zorder=2)
+        self.ax.add_collection(self._curves, autolim=False)
+        # Legend-only Line2D per curve, carrying each curve's style
+        self._handles = {}
+
+    def _apply_style(self, style: tuple):
+        target_currency, TEXT, TICK, SPINE, GRID, FAINT, CURR_COLOR, LAST_COLOR, AVG_COLOR = style
+        self._style = style
+        ax, fig = self.ax, self.figure
+        self._handles = {
+            "cur":  Line2D([], [], label="This month (to date)", linewidth=2.4, color=CURR_COLOR),
+            "prev": Line2D([], [], label="Last month", linewidth=1.9, color=LAST_COLOR),
+            "avg":  Line2D([], [], label="12-month average", linewidth=1.9, color=AVG_COLOR),
+        }
+
+        if self._minimal:
+            for s in ax.spines.values():
+                s.set_visible(True)
+                s.set_linewidth(1.2)
+                s.set_color(FAINT)
+            ax.grid(False)
+            ax.set_title("")
+            ax.set_xlabel("")
+            ax.set_ylabel("")
+            ax.tick_params(axis="both", which="both", bottom=True, top=True, left=True, right=True,
+                           labelbottom=False, labelleft=False, length=3, width=1.0, colors=FAINT)
+            fig.subplots_adjust(left=0.02, right=0.98, top=0.98, bottom=0.02)
+        else:
+            for s in ax.spines.values():
+                s.set_visible(True)
+                s.set_linewidth(1.0)
+                s.set_color(SPINE)
+            ax.grid(True, which="major", color=GRID, linewidth=1.0)
+            ax.set_title("Cumulative Expenditure — This Month vs Last & 12-month Avg", color=TEXT, fontsize=13, pad=8)
+            ax.set_xlabel("Day of month", color=TEXT, fontsize=10)
+            ax.set_ylabel(f"Amount ({target_currency})", color=TEXT, fontsize=10)
+            ax.tick_params(axis="x", colors=TICK, labelsize=9, length=3)
+            ax.tick_params(axis="y", colors=TICK, labelsize=9, length=3)
+            fig.subplots_adjust(left=0.08, right=0.98, top=0.90, bottom=0.14)
+
+    def refresh(
+        self,
+        timeframe: str = "this_month",
+        toggle_state: int = 0,
+        skip_months: list[str] | None = None,
+        target_currency: str = "EUR",
+    ):
+        if timeframe != "this_month":
+            raise ValueError("cumulative_expenditure_qt currently supports the 'this_month' view.")
+
+        pal = _theme_palette()
+        if pal is not None:
+            TEXT   = pal.get("TEXT", "#E8ECF6")
+            TICK   = pal.get("TICK", "#B8C1D9")
+            CURR_COLOR = pal.get("ACCENT_BLUE", "#2F6BCE")
+            LAST_COLOR = pal.get("ACCENT_BLUE_SOFT", "#84A6E8")
+            AVG_COLOR  = pal.get("TEAL", "#69C4B8")
+            if pal["variant"] == "light":
+                SPINE = (0, 0, 0, 0.25)
+                GRID  = (0, 0, 0, 0.10)
+                FAINT = (0, 0, 0, 0.28)
+            else:
+                SPINE = (1, 1, 1, 0.18)
+                GRID  = (1, 1, 1, 0.10)
+                FAINT = (1, 1, 1, 0.28)
+        else:
+            TEXT  = "#E8ECF6"
+            TICK  = "#B8C1D9"
+            SPINE = (1, 1, 1, 0.18)
+            GRID  = (1, 1, 1, 0.10)
+            FAINT = (1, 1, 1, 0.28)
+            CURR_COLOR = "#2F6BCE"
+            LAST_COLOR = "#84A6E8"
+            AVG_COLOR  = "#69C4B8"
+
+        skip_months = set(skip_months or [])
+
+        # Dates come pre-parsed as YYYYMMDD ints, so matching a day is one integer
+        # compare; the toggle drops fixed (type 1) categories only
+        arr = _expense_arrays()
+        keep = arr["cat_type"] != 1 if toggle_state == 1 else np.ones(len(arr["ymd"]), dtype=bool)
+        day_keys = arr["ymd"][keep]
+        # No exchange-rate source: costs are summed as stored, in their own currency
+        converted = np.nan_to_num(arr["cost"][keep], nan=0.0)
+
+        def _cumulative_for_months(months_list: list[tuple[int, int]]) -> dict[tuple[int, int], list[float]]:
+            # Daily totals for every requested month from a single bincount over
+            # (month row, day) slots, instead of one masked scan per month
+            months = list(dict.fromkeys(months_list))
+            month_keys = np.array([y * 100 + m for (y, m) in months], dtype=np.int64)
+            order = np.argsort(month_keys)
+            sorted_keys = month_keys[order]
+            ym, day = day_keys // 100, day_keys % 100
+            pos = np.minimum(np.searchsorted(sorted_keys, ym), len(months) - 1)
+            hit = (sorted_keys[pos] == ym) & (day >= 1) & (day <= 31)
+            slots = order[pos[hit]] * 32 + day[hit]
+            daily = np.bincount(slots, weights=converted[hit], minlength=len(months) * 32).reshape(len(months), 32)
+
+            curves = {}
+            for row, (y, m) in enumerate(months):
+                month_daily = daily[row, 1:monthrange(y, m)[1] + 1]
+                # Python's round (correctly rounded), not np.round, to keep cent values as before
+                curves[(y, m)] = [round(v, 2) for v in np.cumsum([round(v, 2) for v in month_daily.tolist()]).tolist()]
+            return curves
+
+        def _average_cumulative(curves: list[list[float]]) -> list[float]:
+            if not curves:
+                return []
+            max_days = max(len(cum) for cum in curves)
+            # One row per month; shorter months hold their final total to max_days
+            mat = np.vstack([np.pad(np.asarray(cum), (0, max_days - len(cum)), mode="edge") for cum in curves])
+            return [round(v, 2) for v in (mat.sum(axis=0) / len(curves)).tolist()]
+
+        today = date.today()
+        cur_y, cur_m = today.year, today.month
+        last_day_prev_month = (today.replace(day=1) - relativedelta(days=1))
+        prev_y, prev_m = last_day_prev_month.year, last_day_prev_month.month
+
+        months_for_avg = []
+        cursor = last_day_prev_month.replace(day=1)
+        for _ in range(12):
+            ym_key = f"{cursor.year:04d}-{cursor.month:02d}"
+            if ym_key not in skip_months:
+                months_for_avg.append((cursor.year, cursor.month))
+            cursor = (cursor - relativedelta(months=1))
+
+        curves = _cumulative_for_months([(cur_y, cur_m), (prev_y, prev_m)] + months_for_avg)
+
+        cur_full_cum = curves[(cur_y, cur_m)]
+        cur_x = list(range(1, today.day + 1))
+        cur_y_vals = cur_full_cum[: today.day]
+
+        prev_full_cum = curves[(prev_y, prev_m)]
+        prev_x = list(range(1, len(prev_full_cum) + 1))
+        prev_y_vals = prev_full_cum
+
+        avg_curve = _average_cumulative([curves[ym] for ym in months_for_avg])
+        avg_x = list(range(1, len(avg_curve) + 1))
+        avg_y_vals = avg_curve
+
+        # Axes styling is redone only when the theme or currency changed;
+        # otherwise a refresh just swaps segments and limits
+        style = (target_currency, TEXT, TICK, SPINE, GRID, FAINT, CURR_COLOR, LAST_COLOR, AVG_COLOR)
+        if style != self._style:
+            self._apply_style(style)
+        ax, handles = self.ax, self._handles
+
+        shown = [
+            (handles[key], np.column_stack([xs, ys]))
+            for key, xs, ys in (("cur", cur_x, cur_y_vals), ("prev", prev_x, prev_y_vals), ("avg", avg_x, avg_y_vals))
+            if xs and ys
+        ]
+        self._curves.set_segments([seg for _, seg in shown])
+        self._curves.set_color([h.get_color() for h, _ in shown])
+        self._curves.set_linewidth([h.get_linewidth() for h, _ in shown])
+
+        max_len = max(len(cur_x), len(prev_x), len(avg_x))
+        ax.set_xlim(1, max_len if max_len > 1 else 1)
+        ymin = 0.0
+        ymax = max((cur_y_vals or [0]) + (prev_y_vals or [0]) + (avg_y_vals or [0])) if (cur_y_vals or prev_y_vals or avg_y_vals) else 1.0
+        ax.set_ylim(ymin, ymax * 1.05 if ymax > 0 else 1.0)
+
+        if not self._minimal:
+            # Legend lists only the curves that have data
+            leg = ax.legend(handles=[h for h, _ in shown], loc="best", frameon=False)
+            if leg:
+                for t in leg.get_texts():
+                    t.set_color(TEXT)
+
+        self.draw_idle()
+        return self
+
 def cumulative_expenditure_qt(
     timeframe: str = "this_month",
     toggle_state: int = 0,
@@ -440,127 +1111,11 @@ def cumulative_expenditure_qt(
     target_currency: str = "EUR",
     minimal: bool = True,
 ):
-    from datetime import date
-    from calendar import monthrange
-    from dateutil.relativedelta import relativedelta
-    from matplotlib.figure import Figure
-    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-    from PySide6.QtCore import Qt
-    from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QSizePolicy
-
-    def _to_hex(c):
-        try:
-            return c.name()
-        except Exception:
-            return str(c)
-
-    try:
-        from frontend.theme import current_theme
-        t = current_theme()
-        variant = getattr(t, "variant", "dark")
-        TEXT   = _to_hex(getattr(t, "TEXT", "#E8ECF6"))
-        TICK   = _to_hex(getattr(t, "TICK", "#B8C1D9"))
-        CURR_COLOR = _to_hex(getattr(t, "ACCENT_BLUE", "#2F6BCE"))
-        LAST_COLOR = _to_hex(getattr(t, "ACCENT_BLUE_SOFT", "#84A6E8"))
-        AVG_COLOR  = _to_hex(getattr(t, "TEAL", "#69C4B8"))
-        if variant == "light":
-            SPINE = (0, 0, 0, 0.25)
-            GRID  = (0, 0, 0, 0.10)
-            FAINT = (0, 0, 0, 0.28)
-        else:
-            SPINE = (1, 1, 1, 0.18)
-            GRID  = (1, 1, 1, 0.10)
-            FAINT = (1, 1, 1, 0.28)
-    except Exception:
-        TEXT  = "#E8ECF6"
-        TICK  = "#B8C1D9"
-        SPINE = (1, 1, 1, 0.18)
-        GRID  = (1, 1, 1, 0.10)
-        FAINT = (1, 1, 1, 0.28)
-        CURR_COLOR = "#2F6BCE"
-        LAST_COLOR = "#84A6E8"
-        AVG_COLOR  = "#69C4B8"
-
-    try:
-        from backend.crud.expenses import get_all_expenses
-    except Exception:
-        def get_all_expenses():
-            return []
-
-    fixed_ids: set[int] = set()
-    if toggle_state == 1:
-        try:
-            from backend.crud.categories import get_all_categories_full
-            cats = get_all_categories_full() or []
-            fixed_ids = {int(c[0]) for c in cats if len(c) > 3 and int(c[3] or 0) == 1}
-        except Exception:
-            fixed_ids = set()
-
-    def _currency_conversion_or_none(amount: float, from_cur: str, to_cur: str) -> float | None:
-        try:
-            from backend.high_level.analysis import currency_conversion
-            return float(currency_conversion(amount, from_currency=from_cur, to_currency=to_cur))
-        except Exception:
-            return None
-
-    def _convert_cost(cost: float, wallet_id: int) -> float:
-        try:
-            from backend.crud.wallets import get_wallet_by_id
-            w = get_wallet_by_id(int(wallet_id))
-            w_currency = str(w[3]) if (w and len(w) > 3 and w[3] is not None) else None
-            if w_currency and w_currency != target_currency:
-                converted = _currency_conversion_or_none(cost, w_currency, target_currency)
-                if isinstance(converted, (int, float)):
-                    return float(converted)
-        except Exception:
-            pass
-        return float(cost or 0.0)
-
-    def _passes_toggle(exp_row) -> bool:
-        if toggle_state != 1:
-            return True
-        try:
-            cat_id = int(exp_row[2])
-            return cat_id not in fixed_ids
-        except Exception:
-            return True
-
-    skip_months = set(skip_months or [])
-    _all = [e for e in (get_all_expenses() or []) if len(e) >= 7]
-    expenses = [e for e in _all if _passes_toggle(e)]
-
-    def _sum_for_day(d: date) -> float:
-        ds = d.strftime("%Y-%m-%d")
-        total = 0.0
-        for e in expenses:
-            if str(e[4]) == ds:
-                total += _convert_cost(float(e[3] or 0.0), int(e[6] or 0))
-        return round(total, 2)
-
-    def _cumulative_for_month(y: int, m: int) -> list[float]:
-        days = monthrange(y, m)[1]
-        run = 0.0
-        cum = []
-        for day in range(1, days + 1):
-            run += _sum_for_day(date(y, m, day))
-            cum.append(round(run, 2))
-        return cum
-
-    def _average_cumulative(months_list: list[tuple[int, int]]) -> list[float]:
-        if not months_list:
-            return []
-        max_days = max(monthrange(y, m)[1] for (y, m) in months_list)
-        per_month_cum = [_cumulative_for_month(y, m) for (y, m) in months_list]
-        avg_curve = []
-        for k in range(1, max_days + 1):
-            vals = []
-            for cm in per_month_cum:
-                idx = min(k, len(cm)) - 1
-                vals.append(cm[idx])
-            avg_curve.append(round(sum(vals) / len(vals), 2))
-        return avg_curve
-
-    today = date.today()
+    """
+    Running totals of this month's spending against last month and the
+    12-month average. Returns a canvas; call .refresh() on it with the same
+    arguments (minus minimal) to redraw in place.
+    """
     if timeframe != "this_month":
         w = QWidget()
         w.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -570,80 +1125,7 @@ def cumulative_expenditure_qt(
         msg.setStyleSheet("color:#a00;")
         lay.addWidget(msg, 1)
         return w
-
-    cur_y, cur_m = today.year, today.month
-    cur_full_cum = _cumulative_for_month(cur_y, cur_m)
-    cur_x = list(range(1, today.day + 1))
-    cur_y_vals = cur_full_cum[: today.day]
-
-    last_day_prev_month = (today.replace(day=1) - relativedelta(days=1))
-    prev_y, prev_m = last_day_prev_month.year, last_day_prev_month.month
-    prev_full_cum = _cumulative_for_month(prev_y, prev_m)
-    prev_x = list(range(1, len(prev_full_cum) + 1))
-    prev_y_vals = prev_full_cum
-
-    months_for_avg = []
-    cursor = last_day_prev_month.replace(day=1)
-    for _ in range(12):
-        ym_key = f"{cursor.year:04d}-{cursor.month:02d}"
-        if ym_key not in skip_months:
-            months_for_avg.append((cursor.year, cursor.month))
-        cursor = (cursor - relativedelta(months=1))
-    avg_curve = _average_cumulative(months_for_avg) if months_for_avg else []
-    avg_x = list(range(1, len(avg_curve) + 1))
-    avg_y_vals = avg_curve
-
-    fig = Figure(figsize=(10, 4.6), dpi=100)
-    fig.patch.set_alpha(0.0)
-    ax = fig.add_subplot(111)
-    ax.set_facecolor("none")
-
-    if cur_x and cur_y_vals:
-        ax.plot(cur_x, cur_y_vals, label="This month (to date)", linewidth=2.4, color=CURR_COLOR)
-    if prev_x and prev_y_vals:
-        ax.plot(prev_x, prev_y_vals, label="Last month", linewidth=1.9, color=LAST_COLOR)
-    if avg_x and avg_y_vals:
-        ax.plot(avg_x, avg_y_vals, label="12-month average", linewidth=1.9, color=AVG_COLOR)
-
-    max_len = max(len(cur_x), len(prev_x), len(avg_x))
-    ax.set_xlim(1, max_len if max_len > 1 else 1)
-    ymin = 0.0
-    ymax = max((cur_y_vals or [0]) + (prev_y_vals or [0]) + (avg_y_vals or [0])) if (cur_y_vals or prev_y_vals or avg_y_vals) else 1.0
-    ax.set_ylim(ymin, ymax * 1.05 if ymax > 0 else 1.0)
-
-    if minimal:
-        for s in ax.spines.values():
-            s.set_visible(True)
-            s.set_linewidth(1.2)
-            s.set_color(FAINT)
-        ax.grid(False)
-        ax.set_title("")
-        ax.set_xlabel("")
-        ax.set_ylabel("")
-        ax.legend_.remove() if ax.get_legend() else None
-        ax.tick_params(axis="both", which="both", bottom=True, top=True, left=True, right=True,
-                       labelbottom=False, labelleft=False, length=3, width=1.0, colors=FAINT)
-        fig.subplots_adjust(left=0.02, right=0.98, top=0.98, bottom=0.02)
-    else:
-        for s in ax.spines.values():
-            s.set_visible(True)
-            s.set_linewidth(1.0)
-            s.set_color(SPINE)
-        ax.grid(True, which="major", color=GRID, linewidth=1.0)
-        ax.set_title("Cumulative Expenditure — This Month vs Last & 12-month Avg", color=TEXT, fontsize=13, pad=8)
-        ax.set_xlabel("Day of month", color=TEXT, fontsize=10)
-        ax.set_ylabel(f"Amount ({target_currency})", color=TEXT, fontsize=10)
-        ax.tick_params(axis="x", colors=TICK, labelsize=9, length=3)
-        ax.tick_params(axis="y", colors=TICK, labelsize=9, length=3)
-        leg = ax.legend(loc="best", frameon=False)
-        if leg:
-            for t in leg.get_texts():
-                t.set_color(TEXT)
-        fig.subplots_adjust(left=0.08, right=0.98, top=0.90, bottom=0.14)
-
-    canvas = FigureCanvas(fig)
-    canvas.setStyleSheet("background: transparent;")
-    return canvas
+    return _CumulativeCanvas(minimal).refresh(timeframe, toggle_state, skip_months, target_currency)
 
 def expenses_in_calendar_qt(toggle_state: int = 0, main_wallet: int | None = None):
     """
@@ -651,63 +1133,45 @@ def expenses_in_calendar_qt(toggle_state: int = 0, main_wallet: int | None = Non
 
     Now theme-aware: reads colors & variant from frontend.theme.current_theme().
     """
-    import calendar
-    from collections import defaultdict
-    from datetime import datetime
-    import numpy as np
-    import matplotlib as mpl
-    from matplotlib.figure import Figure
-    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-    from matplotlib.colors import LinearSegmentedColormap, Normalize
-    try:
-        from frontend.theme import current_theme
-        T = current_theme()
-    except Exception:
-        class _F: pass
-        T = _F()
-        T.variant = "dark"
-        T.MAGENTA = type("C", (), {"name": lambda self="#B91D73": self})()
-        T.ACCENT_RED = type("C", (), {"name": lambda self="#E53935": self})()
-        T.TEXT = "#FFFFFF"; T.TEXT_SECONDARY = "#B7B9BE"
-        T.PLUM = type("C", (), {"name": lambda self="#1A0D1F": self,
-                                "darker": lambda self, f=200: self})()
-    def _hex(qcolor):
-        try:
-            return qcolor.name()
-        except Exception:
-            return str(qcolor)
-    if getattr(T, "variant", "dark") == "light":
+    # Without frontend.theme: the original dark palette
+    pal = _theme_palette() or {
+        "variant": "dark", "PLUM_DARK": "#1A0D1F", "MAGENTA": "#B91D73",
+        "ACCENT_RED": "#E53935", "TEXT": "#FFFFFF", "TEXT_SECONDARY": "#B7B9BE",
+    }
+    if pal["variant"] == "light":
         base0 = "#ECEFF4"
         ramp_colors = [
             "#E6E7EB",
-            _hex(getattr(T, "MAGENTA", T)),
-            _hex(getattr(T, "ACCENT_RED", T)),
+            pal.get("MAGENTA", "#B91D73"),
+            pal.get("ACCENT_RED", "#E53935"),
         ]
         grid_rgba = (0, 0, 0, 0.10)
         axis_face = (0, 0, 0, 0.03)
-        tick_color = getattr(T, "TEXT_SECONDARY", "#4B5563")
-        title_color = getattr(T, "TEXT", "#0E1220")
+        tick_color = pal.get("TEXT_SECONDARY", "#4B5563")
+        title_color = pal.get("TEXT", "#0E1220")
         cbar_tick = tick_color
         cbar_label = tick_color
     else:
-        try:
-            base0 = T.PLUM.darker(220).name()
-        except Exception:
-            base0 = "#2A1028"
+        base0 = pal.get("PLUM_DARK", "#2A1028")
         ramp_colors = [
             base0,
-            _hex(getattr(T, "MAGENTA", T)),
-            _hex(getattr(T, "ACCENT_RED", T)),
+            pal.get("MAGENTA", "#B91D73"),
+            pal.get("ACCENT_RED", "#E53935"),
         ]
         grid_rgba = (1, 1, 1, 0.06)
         axis_face = (1, 1, 1, 0.02)
-        tick_color = getattr(T, "TEXT_SECONDARY", "#B7B9BE")
-        title_color = getattr(T, "TEXT", "#FFFFFF")
+        tick_color = pal.get("TEXT_SECONDARY", "#B7B9BE")
+        title_color = pal.get("TEXT", "#FFFFFF")
         cbar_tick = tick_color
         cbar_label = tick_color
-    expenses = get_all_expenses()
-    categories = get_all_categories()
-    filtered_expenses = filter_expenses_by_toggle(expenses, categories, toggle_state)
+    arr = _expense_arrays()
+    today = datetime.today()
+    current_year = today.year
+    current_month = today.month
+    rows = (
+        (arr["ymd"] // 100 == current_year * 100 + current_month)
+        & _toggle_rows(arr, toggle_state)
+    )
     currency_code = "EUR"
     if main_wallet is not None:
         try:
@@ -718,36 +1182,23 @@ def expenses_in_calendar_qt(toggle_state: int = 0, main_wallet: int | None = Non
         except Exception:
             pass
         try:
-            filtered_expenses = [
-                e for e in filtered_expenses
-                if len(e) > 6 and e[6] == int(main_wallet)
-            ]
+            rows &= arr["wallet_id"] == int(main_wallet)
         except Exception:
-            filtered_expenses = []
-    today = datetime.today()
-    current_year = today.year
-    current_month = today.month
-    month_str = f"{current_year}-{current_month:02d}"
-    daily_totals = defaultdict(float)
-    for exp in filtered_expenses:
-        date_str = exp[4]
-        if isinstance(date_str, str) and date_str.startswith(month_str):
-            try:
-                day = int(date_str[-2:])
-                daily_totals[day] += float(exp[3])
-            except Exception:
-                pass
+            rows[:] = False
+    days = arr["ymd"][rows] % 100
+    daily_totals = np.bincount(days, weights=arr["cost"][rows], minlength=32)
+    has_day = np.bincount(days, minlength=32) > 0
     cal = calendar.Calendar()
     month_matrix = cal.monthdayscalendar(current_year, current_month)
-    num_days = mpl.dates.num2date(mpl.dates.date2num(datetime(current_year, current_month, 1))).month
     num_days = calendar.monthrange(current_year, current_month)[1]
-    heatmap_data = []
-    for week in month_matrix:
-        row = []
-        for day in week:
-            row.append(0 if day == 0 or day > num_days else daily_totals.get(day, 0.0))
-        heatmap_data.append(row)
-    max_val = max(daily_totals.values()) if daily_totals else 1.0
+    month_days = np.array(month_matrix)
+    heatmap_data = np.where(
+        (month_days > 0) & (month_days <= num_days),
+        daily_totals[month_days],
+        0.0,
+    )
+    max_val = daily_totals[has_day].max() if has_day.any() else 1.0
+
     fig = Figure(figsize=(10, 6), dpi=100, facecolor=(0, 0, 0, 0))
     ax = fig.add_subplot(111, facecolor=axis_face)
     cmap = LinearSegmentedColormap.from_list("themed_ramp", ramp_colors)
@@ -771,23 +1222,20 @@ def expenses_in_calendar_qt(toggle_state: int = 0, main_wallet: int | None = Non
     ax.set_yticklabels([f"Week {i+1}" for i in range(len(month_matrix))],
                        fontsize=10, color=tick_color)
     ax.tick_params(axis='y', which='major', pad=6)
-    for i, week in enumerate(month_matrix):
-        for j, day in enumerate(week):
-            if day == 0 or day > num_days:
-                continue
-            val = daily_totals.get(day, 0.0)
-            if val > 0:
-                lbl = f"{day}\n{int(val)} {currency_code}"
-                col = title_color
-                alpha = 0.95
-            else:
-                lbl = f"{day}"
-                col = tick_color
-                alpha = 0.90
-            ax.text(j, i, lbl, ha='center', va='center',
-                    fontsize=8.5, color=col, alpha=alpha, linespacing=0.9)
-    import calendar as _cal
-    ax.set_title(f"{_cal.month_name[current_month]} {current_year}",
+    # Day labels: cells, values and styles picked with array ops, then one
+    # Text per day sharing a single style dict
+    rows_i, cols_j = np.nonzero((month_days > 0) & (month_days <= num_days))
+    cell_days = month_days[rows_i, cols_j]
+    cell_vals = daily_totals[cell_days]
+    spent = cell_vals > 0
+    text_style = dict(ha='center', va='center', fontsize=8.5, linespacing=0.9)
+    for i, j, day, val, has_spend in zip(rows_i.tolist(), cols_j.tolist(), cell_days.tolist(),
+                                         cell_vals.tolist(), spent.tolist()):
+        if has_spend:
+            ax.text(j, i, f"{day}\n{int(val)} {currency_code}", color=title_color, alpha=0.95, **text_style)
+        else:
+            ax.text(j, i, f"{day}", color=tick_color, alpha=0.90, **text_style)
+    ax.set_title(f"{calendar.month_name[current_month]} {current_year}",
                  fontsize=16, fontweight="bold", color=title_color, pad=12)
     for spine in ax.spines.values():
         spine.set_visible(False)
@@ -805,138 +1253,137 @@ def expenses_in_calendar_qt(toggle_state: int = 0, main_wallet: int | None = Non
     cb.ax.tick_params(labelsize=9, colors=cbar_tick)
     for spine in cb.ax.spines.values():
         spine.set_visible(False)
-    canvas = FigureCanvas(fig)
+    canvas = _ResizeDebouncedCanvas(fig)
     canvas.setMinimumSize(0, 0)
     return canvas
 
-def weekly_exp_trend_qt(n: int = 10, toggle_state: int = 0):
-    """
-    Qt version of weekly_exp_trend.
-    Returns a FigureCanvas (Qt widget) showing weekly expenses for the past `n` weeks
-    and a simple linear trend line. Respects toggle_state.
-
-    Theme-aware (no API change):
-    - Pulls colors from frontend.theme.current_theme() when available.
-    - Falls back to previous hard-coded palette if theme module isn't present.
-    """
-    import numpy as np
-    from matplotlib.figure import Figure
-    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-
-    # ---- THEME LOOKUP (non-breaking) ---------------------------------------
-    def _to_hex(c):
-        # QColor or similar with .name() => "#RRGGBB"; else assume string like "#fff..."
-        try:
-            return c.name()
-        except Exception:
-            return str(c)
-
-    try:
-        # Optional dependency: we only read if present
-        from frontend.theme import current_theme  # type: ignore
-        t = current_theme()
-        variant = getattr(t, "variant", "dark")
-
-        TEXT   = _to_hex(getattr(t, "TEXT",   "#E8ECF6"))
-        TICK   = _to_hex(getattr(t, "TICK",   "#B8C1D9"))
-        SERIES = _to_hex(getattr(t, "ACCENT_BLUE", "#2F6BCE"))
-        TREND  = _to_hex(getattr(t, "MAGENTA",     "#B91D73"))
-
-        if variant == "light":
-            SPINE = (0, 0, 0, 0.25)   # subtle black spines in light
-            GRID  = (0, 0, 0, 0.10)   # soft grid in light
+class _WeeklyTrendCanvas(_RefreshableCanvas):
+    """Weekly totals with a dashed least-squares trend (see weekly_exp_trend_qt)."""
+    def __init__(self):
+        super().__init__((9, 4.8))
+        ax = self.ax
+        self._line, = ax.plot([], [], marker='o', markersize=4.0, linewidth=2.0, label='Weekly Expenses',
+                              markeredgecolor="white", markeredgewidth=0.8)
+        self._trend, = ax.plot([], [], linestyle='--', linewidth=1.5, label='Trend')
+        self._empty = ax.text(0.5, 0.5, "No data available to plot.", transform=ax.transAxes,
+                              ha="center", va="center", fontsize=12, visible=False)
+
+    def refresh(self, n: int = 10, toggle_state: int = 0):
+        # ---- THEME (non-breaking) ------------------------------------------
+        pal = _theme_palette()
+        if pal is not None:
+            TEXT   = pal.get("TEXT",   "#E8ECF6")
+            TICK   = pal.get("TICK",   "#B8C1D9")
+            SERIES = pal.get("ACCENT_BLUE", "#2F6BCE")
+            TREND  = pal.get("MAGENTA",     "#B91D73")
+
+            if pal["variant"] == "light":
+                SPINE = (0, 0, 0, 0.25)   # subtle black spines in light
+                GRID  = (0, 0, 0, 0.10)   # soft grid in light
+            else:
+                SPINE = (1, 1, 1, 0.18)   # subtle white spines in dark
+                GRID  = (1, 1, 1, 0.08)   # soft grid in dark
         else:
-            SPINE = (1, 1, 1, 0.18)   # subtle white spines in dark
-            GRID  = (1, 1, 1, 0.08)   # soft grid in dark
-    except Exception:
-        # Fallback to the original static palette
-        TEXT  = "#E8ECF6"
-        TICK  = "#B8C1D9"
-        SPINE = (1, 1, 1, 0.18)
-        GRID  = (1, 1, 1, 0.08)
-        SERIES = "#2F6BCE"
-        TREND  = "#B91D73"
-    # -----------------------------------------------------------------------
-
-    # Project-provided data helper (unchanged)
-    weekly_data = weekly_expenses(n, toggle_state)
+            # Fallback to the original static palette
+            TEXT  = "#E8ECF6"
+            TICK  = "#B8C1D9"
+            SPINE = (1, 1, 1, 0.18)
+            GRID  = (1, 1, 1, 0.08)
+            SERIES = "#2F6BCE"
+            TREND  = "#B91D73"
+        # --------------------------------------------------------------------
+
+        # Project-provided data helper (unchanged)
+        weekly_data = weekly_expenses(n, toggle_state)
+
+        ax = self.ax
+        self._empty.set_color(TEXT)
+        self._empty.set_visible(not weekly_data and not self._minimal)
+        if not weekly_data:
+            self._line.set_data([], [])
+            self._trend.set_data([], [])
+            ax.set_axis_off()
+            if not self._minimal:
+                self._show_empty_frame()
+            self.draw_idle()
+            return self
+        ax.set_axis_on()
+
+        # Respect original order reversal (assumes weekly_data is most-recent-first)
+        weeks = list(weekly_data.keys())[::-1]
+        amounts = [float(v) for v in list(weekly_data.values())[::-1]]
+
+        x = np.arange(len(weeks))
+        y = np.array(amounts, dtype=float)
+
+        # Main series
+        self._line.set_data(x, y)
+        self._line.set_color(SERIES)
+        self._line.set_markerfacecolor(SERIES)
+
+        # Trend line only if we have 2+ points: closed-form least squares (x is
+        # 0..n-1, so the x spread is never zero)
+        if len(x) >= 2 and np.isfinite(y).all():
+            dx = x - x.mean()
+            slope = (dx * (y - y.mean())).sum() / (dx * dx).sum()
+            intercept = y.mean() - slope * x.mean()
+            self._trend.set_data(x, slope * x + intercept)
+        else:
+            self._trend.set_data([], [])
+        self._trend.set_color(TREND)
 
-    # Prepare figure/canvas early (transparent for glass card)
-    fig = Figure(figsize=(9, 4.8), dpi=100)
-    fig.patch.set_alpha(0.0)
-    ax = fig.add_subplot(111)
-    ax.set_facecolor("none")
+        ax.relim()
+        ax.autoscale_view()
 
-    if not weekly_data:
-        ax.text(0.5, 0.5, "No data available to plot.",
-                ha="center", va="center", fontsize=12, color=TEXT)
-        ax.set_axis_off()
-        canvas = FigureCanvas(fig)
-        canvas.setStyleSheet("background: transparent;")
-        canvas.setMinimumSize(0, 0)
-        return canvas
-
-    # Respect original order reversal (assumes weekly_data is most-recent-first)
-    weeks = list(weekly_data.keys())[::-1]
-    amounts = [float(v) for v in list(weekly_data.values())[::-1]]
-
-    x = np.arange(len(weeks))
-    y = np.array(amounts, dtype=float)
-
-    # Leave space for rotated tick labels
-    fig.subplots_adjust(left=0.10, right=0.98, top=0.88, bottom=0.28)
-
-    # Main series
-    ax.plot(
-        x, y,
-        marker='o', markersize=4.0, linewidth=2.0,
-        color=SERIES, label='Weekly Expenses',
-        markerfacecolor=SERIES, markeredgecolor="white", markeredgewidth=0.8
-    )
+        # Axes & ticks
+        ax.set_xticks(x)
+        ax.set_xticklabels(weeks, rotation=45, ha='right', color=TEXT, fontsize=9)
 
-    # Trend line only if we have 2+ points
-    if len(x) >= 2 and np.isfinite(y).all():
+        # Headroom for markers/labels
         try:
-            coeffs = np.polyfit(x, y, 1)
-            trend = np.poly1d(coeffs)
-            ax.plot(x, trend(x), linestyle='--', color=TREND, linewidth=1.5, label='Trend')
+            y_max = max(y) if len(y) else 0.0
+            ax.set_ylim(0, y_max * 1.10 if y_max > 0 else 1)
         except Exception:
             pass
+        ax.margins(x=0.02)
 
-    # Axes & ticks
-    ax.set_xticks(x)
-    ax.set_xticklabels(weeks, rotation=45, ha='right', color=TEXT, fontsize=9)
-    ax.tick_params(axis='y', colors=TICK, labelsize=9, length=3)
+        if not self._minimal:
+            # Leave space for rotated tick labels
+            self.figure.subplots_adjust(left=0.10, right=0.98, top=0.88, bottom=0.28)
+            ax.tick_params(axis='y', colors=TICK, labelsize=9, length=3)
 
-    # Labels & title
-    ax.set_xlabel('Week', color=TEXT, fontsize=10)
-    ax.set_ylabel('Total Expenses (€)', color=TEXT, fontsize=10)
-    ax.set_title(f'Weekly Expense Trend (Last {n} Weeks)', color=TEXT, fontsize=13, pad=8)
+            # Labels & title
+            ax.set_xlabel('Week', color=TEXT, fontsize=10)
+            ax.set_ylabel('Total Expenses (€)', color=TEXT, fontsize=10)
+            ax.set_title(f'Weekly Expense Trend (Last {n} Weeks)', color=TEXT, fontsize=13, pad=8)
 
-    # Spines & grid
-    for s in ax.spines.values():
-        s.set_linewidth(1.0)
-        s.set_color(SPINE)
-    ax.grid(True, axis="y", color=GRID, linewidth=1.0)
+            # Spines & grid
+            for s in ax.spines.values():
+                s.set_linewidth(1.0)
+                s.set_color(SPINE)
+            ax.grid(True, axis="y", color=GRID, linewidth=1.0)
 
-    # Headroom for markers/labels
-    try:
-        y_max = max(y) if len(y) else 0.0
-        ax.set_ylim(0, y_max * 1.10 if y_max > 0 else 1)
-    except Exception:
-        pass
-    ax.margins(x=0.02)
+            # Legend (light text, no frame)
+            leg = ax.legend(loc='best', frameon=False)
+            if leg:
+                for t in leg.get_texts():
+                    t.set_color(TEXT)
 
-    # Legend (light text, no frame)
-    leg = ax.legend(loc='best', frameon=False)
-    if leg:
-        for t in leg.get_texts():
-            t.set_color(TEXT)
+        self.draw_idle()
+        return self
 
-    canvas = FigureCanvas(fig)
-    canvas.setStyleSheet("background: transparent;")
-    canvas.setMinimumSize(0, 0)
-    return canvas
+def weekly_exp_trend_qt(n: int = 10, toggle_state: int = 0):
+    """
+    Qt version of weekly_exp_trend.
+    Returns a FigureCanvas (Qt widget) showing weekly expenses for the past `n` weeks
+    and a simple linear trend line. Respects toggle_state.
+    Call .refresh(n, toggle_state) on it to redraw in place.
+
+    Theme-aware (no API change):
+    - Pulls colors from frontend.theme.current_theme() when available.
+    - Falls back to previous hard-coded palette if theme module isn't present.
+    """
+    return _WeeklyTrendCanvas().refresh(n, toggle_state)
 
 def plot_category_distribution_qt(
     month: str | None = None,
@@ -947,26 +1394,9 @@ def plot_category_distribution_qt(
     Pie of category proportions for a selected period.
     - If timeframe == 'month': uses the given `month` ('MM-YYYY') or the current month if None.
     - If timeframe in {'6m','year'}: aggregates across that range ending today.
-    Respects toggle_state via filter_expenses_by_toggle(...).
-    Returns a Qt FigureCanvas with a BLACK background.
+    Respects toggle_state (1 = variable categories only).
+    Returns a QPainter-drawn pie widget with a BLACK background.
     """
-    # Local imports to avoid leaking pyplot state
-    from collections import defaultdict
-    from datetime import datetime, timedelta
-    import re
-    import matplotlib as mpl
-    from matplotlib.figure import Figure
-    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-
-    _CAT_COLORS = {
-        "Coffee": "#6F4E37", "Clothes": "#8E44AD", "Extra": "#90A4AE",
-        "Going out": "#C2185B", "Health Care": "#00897B", "Home": "#8D6E63",
-        "Memberships": "#7B1FA2", "Personal Projects": "#3949AB",
-        "Pharmacy": "#26A69A", "Rent": "#455A64", "Restaurant": "#2E7D32",
-        "Shopping": "#EC407A", "Sport": "#FB8C00", "Trasport": "#00ACC1",
-        "Travel": "#1E88E5", "University Payment": "#D32F2F", "Groceries": "#4CAF50",
-    }
-
     # ----- Resolve date range -----
     today = datetime.today()
     if timeframe == "6m":
@@ -995,83 +1425,29 @@ def plot_category_distribution_qt(
         title_tag = datetime.strptime(f"01-{month}", "%d-%m-%Y").strftime("%b %Y")
 
     # ----- Data -----
-    expenses   = get_all_expenses()
-    categories = get_all_categories()
-    filtered   = filter_expenses_by_toggle(expenses, categories, toggle_state)
-
-    id_to_name = {c[0]: c[1] for c in categories}
-
-    totals = defaultdict(float)
-    for exp in filtered:
-        d = str(exp[4])[:10]
-        if start_date <= d <= end_date:
-            name = id_to_name.get(exp[2], "Unknown")
-            try:
-                totals[name] += float(exp[3] or 0.0)
-            except (TypeError, ValueError):
-                pass
-
-    # ----- Figure (BLACK background) -----
-    fig = Figure(figsize=(8, 5), dpi=100)
-    fig.patch.set_facecolor("#000000")  # <-- black figure bg
-    ax = fig.add_subplot(111)
-    ax.set_facecolor("#000000")         # <-- black axes bg
-
-    if not totals:
-        ax.text(0.5, 0.5, "No expenses in selected period.",
-                ha="center", va="center", fontsize=12, color="#BBBBBB")
-        ax.set_axis_off()
-        return FigureCanvas(fig)
-
-    labels = list(totals.keys())
-    sizes  = list(totals.values())
-
-    tab20 = mpl.cm.get_cmap("tab20").colors
-    colors = [_CAT_COLORS.get(lbl, tab20[i % len(tab20)]) for i, lbl in enumerate(labels)]
-
-    fig.subplots_adjust(left=0.08, right=0.68, top=0.88, bottom=0.10)
-    wedges, _, autotexts = ax.pie(
-        sizes,
-        labels=None,
-        colors=colors,
-        autopct="%1.1f%%",
-        startangle=140,
-        textprops={"fontsize": 9, "color": "#FFFFFF"},  # white % labels on black
-        wedgeprops={"linewidth": 0.75, "edgecolor": "white"},
-        pctdistance=0.7
+    totals = _category_totals(start_date, end_date, toggle_state)
+
+    # ----- Pie (BLACK background) -----
+    labels = tuple(totals)
+    slices = list(zip(labels, totals.values(), _slice_colors(labels)))
+    return _PieChartWidget(
+        slices,
+        title=f"Spending Distribution — {title_tag}",
+        empty_text="No expenses in selected period.",
+        start_angle=140,
     )
-    ax.axis("equal")
-
-    leg = ax.legend(
-        wedges, labels, title="Categories", loc="center left",
-        bbox_to_anchor=(1.02, 0.5), borderaxespad=0.0, fontsize=9, title_fontsize=10,
-        facecolor="#000000", edgecolor="#444444"  # legend panel styled for dark bg
-    )
-    leg.get_title().set_color("#FFFFFF")
-    for t in leg.get_texts():
-        t.set_color("#FFFFFF")
-
-    ax.set_title(f"Spending Distribution — {title_tag}", fontsize=13, color="#FFFFFF")
-
-    canvas = FigureCanvas(fig)
-    canvas.setMinimumSize(0, 0)
-    return canvas
 
-def cat_sum_table_qt(timeframe: str = "month", toggle_state: int = 0):
+def cat_sum_table_qt(timeframe: str = "month", toggle_state: int = 0, top_n: Optional[int] = None):
     """
     Qt widget: table of total expenses per category for a given timeframe.
 
     Args:
         timeframe: 'month' | '6m' | 'year' (also accepts 'last_month')
         toggle_state: 0 = include all categories, 1 = exclude fixed
+        top_n: show only the N largest categories (None = all)
     Returns:
-        QWidget (QTableWidget inside) ready to drop into the Insights grid.
+        QWidget (QTableView inside) ready to drop into the Insights grid.
     """
-    from PySide6.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QSizePolicy, QLabel
-    from PySide6.QtCore import Qt
-    from collections import defaultdict
-    from datetime import datetime, timedelta
-
     # ----- date range -----
     today = datetime.today()
     if timeframe == "month":
@@ -1098,21 +1474,7 @@ def cat_sum_table_qt(timeframe: str = "month", toggle_state: int = 0):
         title_lbl  = "This Month"
 
     # ----- data -----
-    expenses   = get_all_expenses()
-    categories = get_all_categories()
-    filtered   = filter_expenses_by_toggle(expenses, categories, toggle_state)
-
-    id_to_name = {c[0]: c[1] for c in categories}
-    sums = defaultdict(float)
-
-    for exp in filtered:
-        d = (exp[4] or "")[:10]
-        if start_date <= d <= end_date:
-            cat_id = exp[2]
-            try:
-                sums[id_to_name.get(cat_id, "Unknown")] += float(exp[3])
-            except (TypeError, ValueError):
-                pass
+    sums = _category_totals(start_date, end_date, toggle_state)
 
     # ----- widget -----
     container = QWidget()
@@ -1128,21 +1490,19 @@ def cat_sum_table_qt(timeframe: str = "month", toggle_state: int = 0):
         layout.addWidget(msg, 1)
         return container
 
-    items = sorted(sums.items(), key=lambda x: x[1], reverse=True)
+    if top_n is None or top_n >= len(sums):
+        items = sorted(sums.items(), key=itemgetter(1), reverse=True)
+    else:
+        # Partial selection: O(N log k) instead of sorting every category
+        items = heapq.nlargest(max(top_n, 0), sums.items(), key=itemgetter(1))
 
-    table = QTableWidget(len(items), 2, container)
-    table.setHorizontalHeaderLabels(["Category", "Total Spent"])
-    table.setEditTriggers(QTableWidget.NoEditTriggers)
-    table.setSelectionBehavior(QTableWidget.SelectRows)
+    table = QTableView(container)
+    table.setModel(_CatSumModel(items, table))
+    table.setEditTriggers(QTableView.NoEditTriggers)
+    table.setSelectionBehavior(QTableView.SelectRows)
     table.setAlternatingRowColors(True)
     table.verticalHeader().setVisible(False)
 
-    for r, (cat, total) in enumerate(items):
-        table.setItem(r, 0, QTableWidgetItem(cat))
-        v = QTableWidgetItem(f"{total:.2f}")
-        v.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        table.setItem(r, 1, v)
-
     hdr = table.horizontalHeader()
     hdr.setSectionResizeMode(0, QHeaderView.Stretch)           # Category
     hdr.setSectionResizeMode(1, QHeaderView.ResizeToContents)  # Total
@@ -1154,55 +1514,8 @@ def cat_sum_table_qt(timeframe: str = "month", toggle_state: int = 0):
 # 🎯 GOAL FUNCTIONS
 # ─────────────────────────────
 
-def plot_completeness_goals_qt(toggle_state: int = 0):
-    """
-    Qt version of plot_completeness_goals.
-    Returns a FigureCanvas (Qt widget) showing each goal's saved vs remaining (stacked bar).
-
-    Theme-aware (no API changes, functionality preserved):
-    - Reads colors from frontend.theme.current_theme() when available.
-    - Falls back to the original palette otherwise.
-    """
-    from matplotlib.figure import Figure
-    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-    import numpy as np
-
-    # ----- THEME LOOKUP (non-breaking) -------------------------------------
-    def _hex(c):
-        try:
-            return c.name()  # QColor-like
-        except Exception:
-            return str(c)
-
-    try:
-        from frontend.theme import current_theme  # optional
-        t = current_theme()
-        variant = getattr(t, "variant", "dark")
-
-        TEXT   = _hex(getattr(t, "TEXT", "#E8ECF6"))
-        TICK   = _hex(getattr(t, "TICK", "#B8C1D9"))
-        ACCENT = _hex(getattr(t, "ACCENT_BLUE", "#2F6BCE"))
-
-        if variant == "light":
-            SPINE  = (0, 0, 0, 0.25)   # subtle black in light
-            GRID   = (0, 0, 0, 0.10)
-            REMAIN = (0, 0, 0, 0.15)   # translucent dark for remaining
-        else:
-            SPINE  = (1, 1, 1, 0.18)   # subtle white in dark
-            GRID   = (1, 1, 1, 0.06)
-            REMAIN = (1, 1, 1, 0.18)   # translucent light for remaining
-    except Exception:
-        # Fallback to the original static palette
-        ACCENT = "#2F6BCE"
-        REMAIN = (1, 1, 1, 0.18)
-        TEXT   = "#E8ECF6"
-        TICK   = "#B8C1D9"
-        SPINE  = (1, 1, 1, 0.18)
-        GRID   = (1, 1, 1, 0.06)
-    # -----------------------------------------------------------------------
-
-    # Fetch categories and active (incomplete) goals
-    categories = get_all_categories()
+def _active_goals(toggle_state: int = 0) -> list:
+    """Incomplete goals as (name, total, saved, cat_id); toggle 1 drops fixed-category goals."""
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("""
@@ -1214,94 +1527,271 @@ def plot_completeness_goals_qt(toggle_state: int = 0):
 
     # Apply toggle: exclude goals tied to fixed categories when toggle_state == 1
     if toggle_state == 1:
-        valid_category_ids = {cat[0] for cat in categories if cat[3] == 0}  # cat[3] = type flag (0 = variable)
+        valid_category_ids = get_category_ids_by_type(0)  # cached variable-category ids
         goals = [g for g in goals if g[3] in valid_category_ids]
+    return goals
+
+class _GoalsProgressCanvas(_RefreshableCanvas):
+    """Saved vs remaining per goal as stacked bars (see plot_completeness_goals_qt)."""
+    def __init__(self, height_in: float):
+        super().__init__((10, height_in))
+        ax = self.ax
+        # Bar containers and percent labels from the last refresh; goal count varies
+        self._bar_artists = []
+        self._empty = ax.text(0.5, 0.5, "No active goals found.", transform=ax.transAxes,
+                              ha="center", va="center", fontsize=12, visible=False)
+        ax.invert_yaxis()
+
+    def refresh(self, toggle_state: int = 0):
+        return self._show(_active_goals(toggle_state))
+
+    def _show(self, goals: list):
+        # ----- THEME (non-breaking) -----------------------------------------
+        pal = _theme_palette()
+        if pal is not None:
+            TEXT   = pal.get("TEXT", "#E8ECF6")
+            TICK   = pal.get("TICK", "#B8C1D9")
+            ACCENT = pal.get("ACCENT_BLUE", "#2F6BCE")
+
+            if pal["variant"] == "light":
+                SPINE  = (0, 0, 0, 0.25)   # subtle black in light
+                GRID   = (0, 0, 0, 0.10)
+                REMAIN = (0, 0, 0, 0.15)   # translucent dark for remaining
+            else:
+                SPINE  = (1, 1, 1, 0.18)   # subtle white in dark
+                GRID   = (1, 1, 1, 0.06)
+                REMAIN = (1, 1, 1, 0.18)   # translucent light for remaining
+        else:
+            # Fallback to the original static palette
+            ACCENT = "#2F6BCE"
+            REMAIN = (1, 1, 1, 0.18)
+            TEXT   = "#E8ECF6"
+            TICK   = "#B8C1D9"
+            SPINE  = (1, 1, 1, 0.18)
+            GRID   = (1, 1, 1, 0.06)
+        # --------------------------------------------------------------------
+
+        ax = self.ax
+        for artist in self._bar_artists:
+            artist.remove()
+        self._bar_artists = []
+
+        self._empty.set_color(TEXT)
+        self._empty.set_visible(not goals and not self._minimal)
+        if not goals:
+            ax.set_axis_off()
+            if not self._minimal:
+                self._show_empty_frame()
+            self.draw_idle()
+            return self
+        ax.set_axis_on()
+
+        # Build series
+        goal_names, reached, remaining = [], [], []
+        for name, total, saved, _ in goals:
+            try:
+                total_f = float(total)
+                saved_f = float(saved)
+            except (TypeError, ValueError):
+                continue
+            rem = max(total_f - saved_f, 0.0)
+            goal_names.append(str(name))
+            reached.append(saved_f)
+            remaining.append(rem)
+
+        y_pos = np.arange(len(goal_names))
+
+        # Bars (stacked)
+        saved_bars = ax.barh(y_pos, reached, color=ACCENT, edgecolor="none", label="Saved")
+        remain_bars = ax.barh(y_pos, remaining, left=reached, color=REMAIN, edgecolor="none", label="Remaining")
+        self._bar_artists = [saved_bars, remain_bars]
+        ax.relim()
+        ax.autoscale_view()
+
+        # Labels & axes
+        ax.set_yticks(y_pos)
+        ax.set_yticklabels(goal_names, color=TEXT, fontsize=9)
+
+        # Percent labels on the saved segment: inside it when it is wide enough,
+        # else just past its end; goals with no total get none
+        reached_arr = np.asarray(reached, dtype=float)
+        total_arr = reached_arr + np.asarray(remaining, dtype=float)
+        pct = np.rint(reached_arr / np.where(total_arr > 0, total_arr, 1.0) * 100).astype(int)
+        pct_labels = np.array([f"{p}%" for p in pct.tolist()], dtype=object)
+        pct_labels[total_arr <= 0] = ""
+        inside = reached_arr >= 0.08 * total_arr
+        self._bar_artists += ax.bar_label(saved_bars, labels=np.where(inside, pct_labels, "").tolist(),
+                                          label_type="center", fontsize=9, color="#FFFFFF")
+        self._bar_artists += ax.bar_label(saved_bars, labels=np.where(inside, "", pct_labels).tolist(),
+                                          label_type="edge", padding=6, fontsize=9, color=TEXT)
+        if self._minimal:
+            for label in self._bar_artists[2:]:
+                label.set_visible(False)
+        else:
+            ax.set_xlabel("Amount", color=TEXT, fontsize=10)
+            ax.set_title("Goal Completion Progress", color=TEXT, fontsize=13, pad=8)
 
-    # Prepare figure/canvas (transparent), dynamic height: ~0.6in per goal, min 3in
-    height_in = max(3.0, 0.6 * max(1, len(goals)))
-    fig = Figure(figsize=(10, height_in), dpi=100)
-    fig.patch.set_alpha(0.0)
+            # Ticks
+            ax.tick_params(axis="x", colors=TICK, labelsize=9, length=3)
+            ax.tick_params(axis="y", length=0)
 
-    ax = fig.add_subplot(111)
-    ax.set_facecolor("none")
+            # Spines
+            for s in ax.spines.values():
+                s.set_linewidth(1.0)
+                s.set_color(SPINE)
 
-    if not goals:
-        ax.text(0.5, 0.5, "No active goals found.",
-                ha="center", va="center", fontsize=12, color=TEXT)
-        ax.set_axis_off()
-        canvas = FigureCanvas(fig)
-        canvas.setStyleSheet("background: transparent;")
-        canvas.setMinimumSize(0, 0)
-        return canvas
-
-    # Build series
-    goal_names, reached, remaining = [], [], []
-    for name, total, saved, _ in goals:
-        try:
-            total_f = float(total)
-            saved_f = float(saved)
-        except (TypeError, ValueError):
-            continue
-        rem = max(total_f - saved_f, 0.0)
-        goal_names.append(str(name))
-        reached.append(saved_f)
-        remaining.append(rem)
+            # Grid (x only)
+            ax.grid(axis="x", color=GRID, linewidth=1.0)
 
-    y_pos = np.arange(len(goal_names))
+            # Legend
+            leg = ax.legend(loc="lower right", frameon=False)
+            if leg:
+                for text in leg.get_texts():
+                    text.set_color(TEXT)
 
-    # Bars (stacked)
-    ax.barh(y_pos, reached, color=ACCENT, edgecolor="none", label="Saved")
-    ax.barh(y_pos, remaining, left=reached, color=REMAIN, edgecolor="none", label="Remaining")
+            # Room for long goal names on the left; compact elsewhere
+            self.figure.subplots_adjust(left=0.30, right=0.98, top=0.88, bottom=0.12)
 
-    # Labels & axes
-    ax.set_yticks(y_pos)
-    ax.set_yticklabels(goal_names, color=TEXT, fontsize=9)
-    ax.invert_yaxis()
-    ax.set_xlabel("Amount", color=TEXT, fontsize=10)
-    ax.set_title("Goal Completion Progress", color=TEXT, fontsize=13, pad=8)
+        self.draw_idle()
+        return self
 
-    # Ticks
-    ax.tick_params(axis="x", colors=TICK, labelsize=9, length=3)
-    ax.tick_params(axis="y", length=0)
+def plot_completeness_goals_qt(toggle_state: int = 0):
+    """
+    Qt version of plot_completeness_goals.
+    Returns a FigureCanvas (Qt widget) showing each goal's saved vs remaining (stacked bar).
+    Call .refresh(toggle_state) on it to redraw in place.
 
-    # Spines
-    for s in ax.spines.values():
-        s.set_linewidth(1.0)
-        s.set_color(SPINE)
+    Theme-aware (no API changes, functionality preserved):
+    - Reads colors from frontend.theme.current_theme() when available.
+    - Falls back to the original palette otherwise.
+    """
+    goals = _active_goals(toggle_state)
+    # Dynamic height: ~0.6in per goal, min 3in
+    canvas = _GoalsProgressCanvas(max(3.0, 0.6 * max(1, len(goals))))
+    return canvas._show(goals)
 
-    # Grid (x only)
-    ax.grid(axis="x", color=GRID, linewidth=1.0)
+# ─────────────────────────────
+# 💰 WALLET FUNCTIONS
+# ─────────────────────────────
 
-    # Legend
-    leg = ax.legend(loc="lower right", frameon=False)
-    if leg:
-        for text in leg.get_texts():
-            text.set_color(TEXT)
+class _NetworthProjectionCanvas(_RefreshableCanvas):
+    """Projected net worth with a ±25% band (see simulate_networth_projection_qt)."""
 
-    # Percent labels on the saved segment
-    for i, (r, rem_v) in enumerate(zip(reached, remaining)):
-        total = r + rem_v
-        if total <= 0:
-            continue
-        pct = int(round((r / total) * 100))
-        if r < 0.08 * total:
-            ax.text(r + (0.02 * max(total, 1.0)), i, f"{pct}%", va="center", ha="left",
-                    fontsize=9, color=TEXT)
-        else:
-            ax.text(r * 0.5, i, f"{pct}%", va="center", ha="center",
-                    fontsize=9, color="#FFFFFF")
+    # Theme colors
+    ACCENT = "#2F6BCE"          # electric blue (UI accent)
+    FILL_ALPHA = 0.18
+    TEXT = "#E8ECF6"            # light text
+    TICK = "#B8C1D9"            # softer ticks
+    SPINE = (1, 1, 1, 0.18)     # subtle white spines
+    GRID = (1, 1, 1, 0.06)      # very soft grid
 
-    # Room for long goal names on the left; compact elsewhere
-    fig.subplots_adjust(left=0.30, right=0.98, top=0.88, bottom=0.12)
+    def __init__(self):
+        super().__init__((9.5, 4.8))
+        ax = self.ax
+        ax.xaxis_date()
+        self._line, = ax.plot([], [], label="Predicted", color=self.ACCENT, linewidth=2.2)
+        # fill_between has no portable in-place update: replaced on each refresh
+        self._band = None
+        self._note = ax.text(0.01, 0.02, "", transform=ax.transAxes, ha="left", va="bottom",
+                             color=self.TICK, fontsize=9, visible=False)
+
+    def refresh(
+        self,
+        n_months: int,
+        avg_income_per_month: float,
+        exclude_months: list = None,
+        target_currency: str = "EUR",
+    ):
+        import matplotlib.dates as mdates
+
+        # Avoid mutable default pitfalls
+        if exclude_months is None:
+            exclude_months = []
+
+        # --- Data inputs (unchanged backend calls) ---
+        avg_expenses = get_avg_monthly_expense(exclude_months, only_non_fixed=False)
+        networth_by_currency = calc_networth(mode=1)  # {currency: amount}
+
+        # Current net worth in target_currency ONLY (no cross-currency conversion)
+        total_current = 0.0
+        try:
+            total_current = float((networth_by_currency or {}).get(target_currency, 0.0))
+        except Exception:
+            total_current = 0.0
 
-    canvas = FigureCanvas(fig)
-    canvas.setStyleSheet("background: transparent;")
-    canvas.setMinimumSize(0, 0)
-    return canvas
+        # Track excluded currencies (purely for user annotation)
+        excluded_currencies = sorted(
+            [c for c in (networth_by_currency or {}).keys() if c != target_currency]
+        )
 
-# ─────────────────────────────
-# 💰 WALLET FUNCTIONS
-# ─────────────────────────────
+        base_date = datetime.today()
+
+        # Fallbacks in case helpers return weird values
+        try:
+            avg_expenses = float(avg_expenses) if avg_expenses is not None else 0.0
+        except Exception:
+            avg_expenses = 0.0
+
+        try:
+            income_minus_exp = float(avg_income_per_month) - avg_expenses
+        except Exception:
+            income_minus_exp = -avg_expenses  # if income is bad, assume just expenses
+
+        # Build projection series: one point per month, ±25% around the trend
+        months = np.arange(max(0, int(n_months)) + 1)
+        dates = [base_date + relativedelta(months=int(i)) for i in months]
+        net = total_current + income_minus_exp * months
+        predicted = np.round(net, 2)
+        upper = np.round(net * 1.25, 2)
+        lower = np.round(net * 0.75, 2)
+
+        # Plot: relim() skips collections, so the band is re-added after it
+        # to extend the data limits as a fresh fill_between would
+        ax = self.ax
+        if self._band is not None:
+            self._band.remove()
+        self._line.set_data(dates, predicted)
+        ax.relim()
+        self._band = ax.fill_between(dates, upper, lower, color=self.ACCENT, alpha=self.FILL_ALPHA, label="±25% range")
+
+        # Formatting: the series is monthly, so tick every k-th month (about
+        # eight ticks at most) instead of AutoDateLocator's per-draw search
+        ax.xaxis.set_major_locator(mdates.MonthLocator(interval=max(1, math.ceil(int(n_months) / 8))))
+        ax.xaxis.set_major_formatter(mdates.DateFormatter("%b %Y"))
+
+        # If we excluded other currencies, annotate so the user knows
+        self._note.set_text(f"Excluded currencies (no FX): {', '.join(excluded_currencies)}")
+        self._note.set_visible(bool(excluded_currencies) and not self._minimal)
+
+        if not self._minimal:
+            # Titles/labels
+            ax.set_title("Future Net Worth Projection", color=self.TEXT, fontsize=13, pad=8)
+            ax.set_xlabel("Date", color=self.TEXT, fontsize=10)
+            ax.set_ylabel(f"Net Worth ({target_currency})", color=self.TEXT, fontsize=10)
+
+            # Ticks
+            ax.tick_params(axis="x", colors=self.TICK, labelsize=9, length=3)
+            ax.tick_params(axis="y", colors=self.TICK, labelsize=9, length=3)
+
+            # Spines
+            for spine in ax.spines.values():
+                spine.set_linewidth(1.0)
+                spine.set_color(self.SPINE)
+
+            # Grid
+            ax.grid(True, which="major", color=self.GRID, linewidth=1.0)
+
+            # Legend
+            leg = ax.legend(loc="best", frameon=False)
+            if leg:
+                for text in leg.get_texts():
+                    text.set_color(self.TEXT)
+
+            # Compact margins to fit tiles; modal still looks good
+            self.figure.subplots_adjust(left=0.08, right=0.98, top=0.88, bottom=0.16)
+
+        self.draw_idle()
+        return self
 
 def simulate_networth_projection_qt(
     n_months: int,
@@ -1313,6 +1803,7 @@ def simulate_networth_projection_qt(
     Qt version of simulate_networth_projection.
     Returns a FigureCanvas (Qt widget) plotting projected net worth over the next n_months
     with a ±25% envelope. Uses Matplotlib with QtAgg backend; no Streamlit.
+    Call .refresh() on it with the same arguments to redraw in place.
 
     IMPORTANT (no FX conversion):
     - We no longer perform cross-currency conversion.
@@ -1325,121 +1816,7 @@ def simulate_networth_projection_qt(
     - Light labels/ticks, subtle white spines/grid
     - Compact margins to fit tiles; ChartTile.mini will further slim for minis
     """
-    from datetime import datetime
-    from dateutil.relativedelta import relativedelta
-    from matplotlib.figure import Figure
-    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-    import matplotlib.dates as mdates
-
-    # Avoid mutable default pitfalls
-    if exclude_months is None:
-        exclude_months = []
-
-    # --- Data inputs (unchanged backend calls) ---
-    avg_expenses = get_avg_monthly_expense(exclude_months, only_non_fixed=False)
-    networth_by_currency = calc_networth(mode=1)  # {currency: amount}
-
-    # Current net worth in target_currency ONLY (no cross-currency conversion)
-    total_current = 0.0
-    try:
-        total_current = float((networth_by_currency or {}).get(target_currency, 0.0))
-    except Exception:
-        total_current = 0.0
-
-    # Track excluded currencies (purely for user annotation)
-    excluded_currencies = sorted(
-        [c for c in (networth_by_currency or {}).keys() if c != target_currency]
-    )
-
-    # Build projection series
-    base_date = datetime.today()
-    dates, predicted, upper, lower = [], [], [], []
-
-    # Fallbacks in case helpers return weird values
-    try:
-        avg_expenses = float(avg_expenses) if avg_expenses is not None else 0.0
-    except Exception:
-        avg_expenses = 0.0
-
-    try:
-        income_minus_exp = float(avg_income_per_month) - avg_expenses
-    except Exception:
-        income_minus_exp = -avg_expenses  # if income is bad, assume just expenses
-
-    for i in range(max(0, int(n_months)) + 1):
-        d = base_date + relativedelta(months=i)
-        net = total_current + income_minus_exp * i
-        dates.append(d)
-        predicted.append(round(net, 2))
-        upper.append(round(net * 1.25, 2))
-        lower.append(round(net * 0.75, 2))
-
-    # --- Figure/axes (transparent, dark-friendly) ---
-    fig = Figure(figsize=(9.5, 4.8), dpi=100)
-    fig.patch.set_alpha(0.0)  # fully transparent background
-
-    ax = fig.add_subplot(111)
-    ax.set_facecolor("none")  # transparent axes
-
-    # Theme colors
-    ACCENT = "#2F6BCE"          # electric blue (UI accent)
-    FILL_ALPHA = 0.18
-    TEXT = "#E8ECF6"            # light text
-    TICK = "#B8C1D9"            # softer ticks
-    SPINE = (1, 1, 1, 0.18)     # subtle white spines
-    GRID = (1, 1, 1, 0.06)      # very soft grid
-
-    # Plot
-    ax.plot(dates, predicted, label="Predicted", color=ACCENT, linewidth=2.2)
-    ax.fill_between(dates, upper, lower, color=ACCENT, alpha=FILL_ALPHA, label="±25% range")
-
-    # Formatting
-    locator = mdates.AutoDateLocator()
-    formatter = mdates.ConciseDateFormatter(locator)
-    ax.xaxis.set_major_locator(locator)
-    ax.xaxis.set_major_formatter(formatter)
-
-    # Titles/labels
-    ax.set_title("Future Net Worth Projection", color=TEXT, fontsize=13, pad=8)
-    ax.set_xlabel("Date", color=TEXT, fontsize=10)
-    ax.set_ylabel(f"Net Worth ({target_currency})", color=TEXT, fontsize=10)
-
-    # If we excluded other currencies, annotate so the user knows
-    if excluded_currencies:
-        note = f"Excluded currencies (no FX): {', '.join(excluded_currencies)}"
-        ax.text(
-            0.01, 0.02, note,
-            transform=ax.transAxes,
-            ha="left", va="bottom",
-            color=TICK, fontsize=9
-        )
-
-    # Ticks
-    ax.tick_params(axis="x", colors=TICK, labelsize=9, length=3)
-    ax.tick_params(axis="y", colors=TICK, labelsize=9, length=3)
-
-    # Spines
-    for spine in ax.spines.values():
-        spine.set_linewidth(1.0)
-        spine.set_color(SPINE)
-
-    # Grid
-    ax.grid(True, which="major", color=GRID, linewidth=1.0)
-
-    # Legend
-    leg = ax.legend(loc="best", frameon=False)
-    if leg:
-        for text in leg.get_texts():
-            text.set_color(TEXT)
-
-    # Compact margins to fit tiles; modal still looks good
-    fig.subplots_adjust(left=0.08, right=0.98, top=0.88, bottom=0.16)
-
-    # Canvas (transparent)
-    canvas = FigureCanvas(fig)
-    canvas.setStyleSheet("background: transparent;")
-    canvas.setMinimumSize(0, 0)
-    return canvas
+    return _NetworthProjectionCanvas().refresh(n_months, avg_income_per_month, exclude_months, target_currency)
 
 def budget_flow_qt(
     toggle_state: int = 0,
@@ -1452,47 +1829,10 @@ def budget_flow_qt(
     UI-theming: fully transparent background so the glass/halo tile shows through,
     and light (white) typography for labels/hover.
     """
-    from PySide6.QtWidgets import QWidget, QVBoxLayout, QSizePolicy
-    from PySide6.QtWebEngineWidgets import QWebEngineView
-    from PySide6.QtCore import Qt
-    from PySide6.QtGui import QColor
-    import plotly.graph_objects as go
-    from collections import defaultdict
-    from datetime import datetime, timedelta
-
-    # ---- Category colors (names must match your DB) ----
-    _CAT_COLORS = {
-        "Coffee":              "#6F4E37",
-        "Clothes":             "#8E44AD",
-        "Extra":               "#90A4AE",
-        "Going out":           "#C2185B",
-        "Health Care":         "#00897B",
-        "Home":                "#8D6E63",
-        "Memberships":         "#7B1FA2",
-        "Personal Projects":   "#3949AB",
-        "Pharmacy":            "#26A69A",
-        "Rent":                "#455A64",
-        "Restaurant":          "#2E7D32",
-        "Shopping":            "#EC407A",
-        "Sport":               "#FB8C00",
-        "Trasport":            "#00ACC1",
-        "Travel":              "#1E88E5",
-        "University Payment":  "#D32F2F",
-        "Groceries":           "#4CAF50",
-    }
     # Tile-friendly accents
     BUDGET_COLOR = "#2F6BCE"
     REMAIN_COLOR = "#BDBDBD"
 
-    def _hex_to_rgba(hex_color: str, alpha: float) -> str:
-        s = (hex_color or "#9E9E9E").lstrip('#')
-        try:
-            r, g, b = int(s[0:2], 16), int(s[2:4], 16), int(s[4:6], 16)
-        except Exception:
-            r, g, b = 158, 158, 158
-        a = max(0.0, min(1.0, float(alpha)))
-        return f"rgba({r},{g},{b},{a})"
-
     today = datetime.today()
 
     # ----- Select date range & months multiplier -----
@@ -1537,22 +1877,9 @@ def budget_flow_qt(
 
     base_budget = float(monthly_budget) * months_mult  # scale by timeframe
 
-    # ----- Load & filter expenses -----
-    expenses   = get_all_expenses()
+    # ----- Totals per category in range (toggle applied) -----
     categories = get_all_categories()
-    filtered   = filter_expenses_by_toggle(expenses, categories, toggle_state)
-
-    id_to_name = {c[0]: c[1] for c in categories}
-
-    # Totals per category in range (already filtered as per toggle)
-    cat_totals = defaultdict(float)
-    for exp in filtered:
-        exp_date = str(exp[4])[:10]
-        if start_date <= exp_date <= end_date:
-            try:
-                cat_totals[id_to_name.get(exp[2], "Unknown")] += float(exp[3] or 0.0)
-            except (TypeError, ValueError):
-                pass
+    cat_totals = _category_totals(start_date, end_date, toggle_state)
 
     # ----- Toggle behavior for BUDGET -----
     if toggle_state == 0:
@@ -1580,88 +1907,14 @@ def budget_flow_qt(
     flows   = values + [remaining]
 
     node_colors = [BUDGET_COLOR] + [_CAT_COLORS.get(n, "#9E9E9E") for n in categories_list] + [REMAIN_COLOR]
-    link_colors = [_hex_to_rgba(_CAT_COLORS.get(n, "#9E9E9E"), 0.45) for n in categories_list]
-    link_colors.append(_hex_to_rgba(REMAIN_COLOR, 0.35))
-
-    # --- Figure (true transparent + light text) ---
-    sankey = go.Sankey(
-        arrangement='snap',
-        node=dict(
-            pad=14,
-            thickness=16,
-            line=dict(color="rgba(255,255,255,0.12)", width=0.6),
-            label=labels,
-            color=node_colors,
-        ),
-        link=dict(source=sources, target=targets, value=flows, color=link_colors),
-        textfont=dict(color="#E8ECF6", size=12),  # force light labels for nodes/links
-        hoverlabel=dict(bgcolor="rgba(255,255,255,0.92)", font_color="#0A0C14"),
-    )
-    fig = go.Figure(data=[sankey])
-
-    fig.update_layout(
-        title_text=(f"{time_title} Budget Flow" if show_title else ""),
-        title_font=dict(color="#FFFFFF", size=14),
-        font=dict(color="#E8ECF6", size=12),
-        margin=dict(l=6, r=6, t=20 if show_title else 4, b=6),
-        paper_bgcolor="rgba(0,0,0,0)",  # allow glass tile to show through
-        plot_bgcolor="rgba(0,0,0,0)",
-    )
-
-    # --- Transparent HTML shell + CSS overrides to kill any Plotly white rects ---
-    fragment = fig.to_html(
-        full_html=False,
-        include_plotlyjs='cdn',
-        config={'displayModeBar': False, 'responsive': True}
+    link_colors = []
+    for hex_color, alpha in [(_CAT_COLORS.get(n, "#9E9E9E"), 0.45) for n in categories_list] + [(REMAIN_COLOR, 0.35)]:
+        color = QColor(hex_color)
+        color.setAlphaF(alpha)
+        link_colors.append(color)
+
+    # Transparent background so the glass tile shows through
+    return _SankeyWidget(
+        labels, sources, targets, flows, node_colors, link_colors,
+        title=(f"{time_title} Budget Flow" if show_title else ""),
     )
-    html = f"""
-    <html>
-      <head>
-        <meta charset="utf-8" />
-        <style>
-          html, body {{
-            background: transparent !important;
-            margin: 0; padding: 0; overflow: hidden;
-          }}
-          .plot-container, .plotly, .plotly div {{
-            background: transparent !important;
-          }}
-          .js-plotly-plot .plotly .main-svg {{
-            background: transparent !important;
-          }}
-          /* This rect is Plotly's plot background; force transparent. */
-          .js-plotly-plot .plotly .bg {{
-            fill: transparent !important;
-          }}
-          /* Expand to parent tile */
-          .plotly-graph-div, .js-plotly-plot {{
-            width: 100% !important;
-            height: 100% !important;
-          }}
-        </style>
-      </head>
-      <body>{fragment}</body>
-    </html>
-    """
-
-    # --- Container & WebView (transparent all the way down) ---
-    container = QWidget()
-    container.setAttribute(Qt.WA_StyledBackground, True)
-    container.setStyleSheet("background: transparent;")
-    container.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-
-    v = QVBoxLayout(container)
-    v.setContentsMargins(0, 0, 0, 0)
-    v.setSpacing(0)
-
-    view = QWebEngineView(container)
-    view.setAttribute(Qt.WA_TranslucentBackground, True)
-    view.setStyleSheet("background: transparent;")
-    # Ensure the web page itself paints transparent (fixes white box on some Qt builds)
-    view.page().setBackgroundColor(QColor(0, 0, 0, 0))
-
-    view.setHtml(html)
-    view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-
-    v.addWidget(view)
-    return container
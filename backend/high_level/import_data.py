@@ -220,12 +220,23 @@ def import_all_from_path(path: str, *, dry_run: bool = True) -> Dict[str, Any]:
 
     If `dry_run` is False, this will additionally call `apply_import(...)`
     to write rows using the CRUD layer (with basic de-duplication and FK mapping).
+
+    SQL dumps from export_all_to_sql (.sql / .sql.zst) are rejected with a
+    ValueError: replay one into a new .db first, then import that.
     """
     if not path or not os.path.exists(path):
         raise FileNotFoundError(f"File not found: {path}")
 
     lower = path.lower()
 
+    if lower.endswith((".sql", ".sql.zst")):
+        # Without this the CSV fallback below reads a dump as zero rows per table
+        raise ValueError(
+            "SQL dumps can't be imported directly. Restore the dump into a new "
+            "database (e.g. `sqlite3 restored.db < dump.sql`, after `zstd -d` "
+            "for .sql.zst) and import that .db file."
+        )
+
     if lower.endswith(".db"):
         rows_raw = _read_db_copy(path)
         kind = "db"
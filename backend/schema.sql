@@ -65,3 +65,10 @@ CREATE TABLE IF NOT EXISTS profile (
     created_at       TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     last_login       TIMESTAMP
 );
+
+-- INDEXES: hot filter columns
+CREATE INDEX IF NOT EXISTS idx_expense_date ON expense(date);
+CREATE INDEX IF NOT EXISTS idx_expense_wallet_date ON expense(wallet_id, date);
+CREATE INDEX IF NOT EXISTS idx_expense_category ON expense(category_id);
+CREATE INDEX IF NOT EXISTS idx_wallet_currency ON wallet(currency);
+CREATE INDEX IF NOT EXISTS idx_goal_completed ON goal(completed);
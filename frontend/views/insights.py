@@ -71,6 +71,7 @@ class ChartTile(QFrame):
         mini_factory: Callable[[], QWidget],
         full_factory: Optional[Callable[[], QWidget]] = None,
         min_height: int = 228,
+        mini_update: Optional[Callable[[QWidget], object]] = None,
     ):
         super().__init__()
         self.setObjectName("InsightsTile")
@@ -80,6 +81,8 @@ class ChartTile(QFrame):
 
         self._mini_factory = mini_factory
         self._full_factory = full_factory if full_factory else mini_factory
+        # Redraws the current mini body in place; a rebuild is the fallback
+        self._mini_update = mini_update
         self._current_body: QWidget | None = None
         self._last_key: Optional[str] = None  # to avoid redundant rebuilds
         self._anim: Optional[QPropertyAnimation] = None  # hold ref to avoid GC / allow cancellation
@@ -167,7 +170,7 @@ class ChartTile(QFrame):
             }}
 
             /* Tables rendered inside tiles (kept functionally identical) */
-            QFrame#InsightsTile QTableWidget {{
+            QFrame#InsightsTile QTableView {{
                 background: rgba(12,14,22,0.40);
                 color: {text};
                 gridline-color: {gridline};
@@ -217,55 +220,6 @@ class ChartTile(QFrame):
         anim.setLoopCount(-1)
         anim.start()
 
-    # ---------- WebEngine transparency ----------
-    def _glassify_webviews(self, root_widget: QWidget | None):
-        if root_widget is None:
-            return
-        try:
-            from PySide6.QtWebEngineWidgets import QWebEngineView
-        except Exception:
-            QWebEngineView = None  # type: ignore
-        if not QWebEngineView:
-            return
-
-        def patch(view):
-            try:
-                view.setAttribute(Qt.WA_TranslucentBackground, True)
-                view.setStyleSheet("background: transparent;")
-                if hasattr(view, "page"):
-                    page = view.page()
-                    try:
-                        page.setBackgroundColor(Qt.transparent)
-                    except Exception:
-                        pass
-                    try:
-                        page.runJavaScript("""
-                            try {
-                                document.documentElement.style.background='transparent';
-                                document.body.style.background='transparent';
-                                const s=document.createElement('style');
-                                s.innerHTML = `
-                                  .plotly .main-svg{ background: transparent !important; }
-                                  .plot-container, .svg-container{ background: transparent !important; }
-                                `;
-                                document.head.appendChild(s);
-                            } catch(e){}
-                        """)
-                    except Exception:
-                        pass
-            except Exception:
-                pass
-
-        try:
-            for v in root_widget.findChildren(QWebEngineView):
-                patch(v)
-                try:
-                    v.loadFinished.connect(lambda _ok, vv=v: patch(vv))
-                except Exception:
-                    pass
-        except Exception:
-            pass
-
     # ---------- swap helpers ----------
     def _swap_body_fade(self, new_widget: QWidget, duration: int = 120):
         """
@@ -329,6 +283,16 @@ class ChartTile(QFrame):
         if state_key is not None and self._last_key == state_key and self._current_body is not None:
             return
 
+        body = self._current_body
+        if self._mini_update is not None and body is not None and _is_valid(body):
+            try:
+                # Skeletons and error labels have no refresh() and raise here
+                self._mini_update(body)
+                self._last_key = state_key or self._last_key
+                return
+            except Exception:
+                pass
+
         try:
             w = self._mini_factory()
         except Exception as e:
@@ -336,8 +300,6 @@ class ChartTile(QFrame):
             w.setStyleSheet("color:#ffbbbb;")
             w.setWordWrap(True)
 
-        self._glassify_webviews(w)
-
         if self._current_body is None:
             self._stack.addWidget(w)
             self._stack.setCurrentWidget(w)
@@ -363,7 +325,6 @@ class ChartTile(QFrame):
             big.setWordWrap(True)
 
         lay.addWidget(big, 1)
-        self._glassify_webviews(big)
 
         close_row = QHBoxLayout()
         close_row.addStretch(1)
@@ -505,6 +466,11 @@ class InsightsPage(QWidget):
 
         def mini(canvas: QWidget, w=4.2, h=3.0, spine_color="#D0D7EA"):
             try:
+                # QPainter charts (e.g. the distribution pie) have their own mini
+                # mode; refreshable canvases use it to keep the styling below
+                set_minimal = getattr(canvas, "set_minimal", None)
+                if set_minimal is not None:
+                    set_minimal(True)
                 fig = getattr(canvas, "figure", None)
                 if fig is None:
                     return canvas
@@ -554,6 +520,8 @@ class InsightsPage(QWidget):
                 n=self._weeks_for_timeframe(), toggle_state=self.toggle_key)),
             full_factory=lambda: weekly_exp_trend_qt(
                 n=self._weeks_for_timeframe(), toggle_state=self.toggle_key),
+            mini_update=lambda w: w.refresh(
+                n=self._weeks_for_timeframe(), toggle_state=self.toggle_key),
         )
 
         # Networth Projection (uses profile budget & skipped months)
@@ -572,7 +540,16 @@ class InsightsPage(QWidget):
                 exclude_months=self._profile_skip_months(),
                 target_currency=self.current_currency(),
             )
-        t4 = ChartTile("Networth Projection", mini_factory=networth_proj_mini, full_factory=networth_proj_full)
+
+        def networth_proj_update(canvas):
+            canvas.refresh(
+                n_months=self._months_for_timeframe(),
+                avg_income_per_month=self._profile_monthly_budget(),
+                exclude_months=self._profile_skip_months(),
+                target_currency=self.current_currency(),
+            )
+        t4 = ChartTile("Networth Projection", mini_factory=networth_proj_mini, full_factory=networth_proj_full,
+                       mini_update=networth_proj_update)
 
         # Budget Flow
         def budget_flow_mini():
@@ -647,7 +624,16 @@ class InsightsPage(QWidget):
                 target_currency=self.current_currency(),
                 minimal=False,
             )
-        t10 = ChartTile("Cumulative Expenditure", mini_factory=cumexp_mini, full_factory=cumexp_full)
+
+        def cumexp_update(canvas):
+            canvas.refresh(
+                timeframe=self._map_timeframe_for_cumulative(),
+                toggle_state=self.toggle_key,
+                skip_months=self._profile_skip_months(),
+                target_currency=self.current_currency(),
+            )
+        t10 = ChartTile("Cumulative Expenditure", mini_factory=cumexp_mini, full_factory=cumexp_full,
+                        mini_update=cumexp_update)
 
         tiles = [t1, t2, t3, t4, t5, t6, t7, t8, t9, t10]
         self._tiles.extend(tiles)
@@ -0,0 +1,13 @@
+import pytest
+
+import backend.db as backend_db
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Point the app at a fresh, initialized database file for one test."""
+    path = tmp_path / "budget_tracker.db"
+    monkeypatch.setattr(backend_db, "_db_path_default", lambda: path)
+    backend_db.initialize_database()
+    yield path
+    backend_db.close_connection()
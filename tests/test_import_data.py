@@ -0,0 +1,19 @@
+import pytest
+
+from backend.high_level.export_data import export_all_to_sql
+from backend.high_level.import_data import import_all_from_path
+
+
+def test_sql_dump_is_rejected_instead_of_importing_nothing(db_path, tmp_path):
+    dump = export_all_to_sql(str(db_path), out_path=str(tmp_path / "backup.sql"))
+
+    with pytest.raises(ValueError, match="SQL dumps"):
+        import_all_from_path(dump, dry_run=True)
+
+
+def test_compressed_sql_dump_is_rejected(db_path, tmp_path):
+    pytest.importorskip("zstandard")
+    dump = export_all_to_sql(str(db_path), out_path=str(tmp_path / "backup.sql.zst"), compress=True)
+
+    with pytest.raises(ValueError, match="SQL dumps"):
+        import_all_from_path(dump, dry_run=True)
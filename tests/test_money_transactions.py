@@ -0,0 +1,120 @@
+import sqlite3
+
+import pytest
+
+from backend.db import get_connection
+from backend.high_level.analysis import complete_goal, record_expenses, redo_expense, transfer_money
+
+
+def _wallet(name, amount, currency="EUR"):
+    with get_connection() as conn:
+        cur = conn.execute("INSERT INTO wallet (name, amount, currency) VALUES (?, ?, ?)", (name, amount, currency))
+        conn.commit()
+        return cur.lastrowid
+
+
+def _balance(wallet_id):
+    with get_connection() as conn:
+        return conn.execute("SELECT amount FROM wallet WHERE id = ?", (wallet_id,)).fetchone()[0]
+
+
+def _count(table):
+    with get_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_transfer_moves_money_between_same_currency_wallets(db_path):
+    giver, receiver = _wallet("a", 100.0), _wallet("b", 5.0)
+
+    transfer_money(giver, receiver, 40.0)
+
+    assert _balance(giver) == 60.0
+    assert _balance(receiver) == 45.0
+
+
+def test_transfer_rolls_back_credit_when_giver_cannot_cover(db_path):
+    # The receiver is credited first; the failed debit must undo it
+    giver, receiver = _wallet("a", 10.0), _wallet("b", 5.0)
+
+    transfer_money(giver, receiver, 40.0)
+
+    assert _balance(giver) == 10.0
+    assert _balance(receiver) == 5.0
+    assert not get_connection().in_transaction
+
+
+def test_transfer_between_currencies_changes_nothing(db_path):
+    giver, receiver = _wallet("a", 100.0, "EUR"), _wallet("b", 5.0, "USD")
+
+    transfer_money(giver, receiver, 40.0)
+
+    assert _balance(giver) == 100.0
+    assert _balance(receiver) == 5.0
+
+
+def test_record_expenses_debits_each_wallet_once(db_path):
+    w1, w2 = _wallet("a", 100.0), _wallet("b", 50.0)
+
+    record_expenses([
+        {"name": "x", "cost": 10.0, "date_str": "2025-01-02", "wallet_id": w1},
+        {"name": "y", "cost": 2.5, "date_str": "2025-01-03", "wallet_id": w1},
+        {"name": "z", "cost": 5.0, "date_str": "2025-01-03", "wallet_id": w2},
+    ])
+
+    assert _count("expense") == 3
+    assert _balance(w1) == 87.5
+    assert _balance(w2) == 45.0
+
+
+def test_record_expenses_rolls_back_on_a_bad_row(db_path):
+    wallet = _wallet("a", 100.0)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        record_expenses([
+            {"name": "ok", "cost": 10.0, "date_str": "2025-01-02", "wallet_id": wallet},
+            {"name": None, "cost": 5.0, "date_str": "2025-01-02", "wallet_id": wallet},
+        ])
+
+    assert _count("expense") == 0
+    assert _balance(wallet) == 100.0
+
+
+def test_redo_expense_refunds_and_deletes(db_path):
+    wallet = _wallet("a", 100.0)
+    record_expenses([{"name": "x", "cost": 30.0, "date_str": "2025-01-02", "wallet_id": wallet}])
+    with get_connection() as conn:
+        expense_id = conn.execute("SELECT id FROM expense").fetchone()[0]
+
+    redo_expense(expense_id)
+
+    assert _count("expense") == 0
+    assert _balance(wallet) == 100.0
+
+
+def _goal(amount):
+    with get_connection() as conn:
+        cur = conn.execute(
+            "INSERT INTO goal (name, amount_to_reach, currency) VALUES (?, ?, 'EUR')", ("bike", amount)
+        )
+        conn.commit()
+        return cur.lastrowid
+
+
+def test_complete_goal_debits_logs_and_removes(db_path):
+    wallet, goal = _wallet("a", 500.0), _goal(120.0)
+
+    complete_goal(goal, wallet)
+
+    assert _balance(wallet) == 380.0
+    assert _count("goal") == 0
+    with get_connection() as conn:
+        assert [tuple(r) for r in conn.execute("SELECT name, cost, description FROM expense")] == [("bike", 120.0, "goal completed")]
+
+
+def test_complete_goal_with_missing_wallet_changes_nothing(db_path):
+    goal = _goal(120.0)
+
+    complete_goal(goal, 999)
+
+    assert _count("goal") == 1
+    assert _count("expense") == 0
@@ -0,0 +1,59 @@
+import base64
+import hashlib
+
+import pytest
+
+from backend.crud.profile import change_password, set_password, upsert_profile, verify_password
+from backend.db import get_connection
+
+
+def _stored_hash():
+    with get_connection() as conn:
+        return conn.execute("SELECT password_hash FROM profile ORDER BY id LIMIT 1").fetchone()[0]
+
+
+def _legacy_pbkdf2(password, salt=b"0123456789abcdef", iterations=1000):
+    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"pbkdf2_sha256${iterations}${base64.b64encode(salt).decode()}${base64.b64encode(dk).decode()}"
+
+
+@pytest.mark.skipif(not hasattr(hashlib, "scrypt"), reason="hashlib built without scrypt")
+def test_new_password_is_scrypt_and_verifies(db_path):
+    set_password("correct horse")
+
+    assert _stored_hash().startswith("scrypt$")
+    assert verify_password("correct horse")
+    assert not verify_password("wrong horse")
+
+
+def test_legacy_pbkdf2_hash_still_verifies(db_path):
+    upsert_profile(password_hash=_legacy_pbkdf2("old secret"))
+
+    assert verify_password("old secret")
+    assert not verify_password("new secret")
+
+
+def test_change_password_from_legacy_hash_rehashes(db_path):
+    legacy = _legacy_pbkdf2("old secret")
+    upsert_profile(password_hash=legacy)
+
+    assert change_password("old secret", "new secret")
+
+    assert _stored_hash() != legacy
+    assert verify_password("new secret")
+    assert not verify_password("old secret")
+
+
+def test_pbkdf2_fallback_without_scrypt(db_path, monkeypatch):
+    monkeypatch.delattr(hashlib, "scrypt", raising=False)
+
+    set_password("no scrypt here")
+
+    assert _stored_hash().startswith("pbkdf2_sha256$")
+    assert verify_password("no scrypt here")
+
+
+def test_unrecognised_hash_never_verifies(db_path):
+    upsert_profile(password_hash="md5$abc$def")
+
+    assert not verify_password("abc")
@@ -0,0 +1,49 @@
+from backend.crud.profile import get_all_profiles, get_current_profile, upsert_profile
+from backend.db import get_connection
+
+
+def _insert_profile(**cols):
+    with get_connection() as conn:
+        names = ", ".join(cols)
+        conn.execute(f"INSERT INTO profile ({names}) VALUES ({', '.join('?' * len(cols))})", tuple(cols.values()))
+        conn.commit()
+
+
+def test_upsert_inserts_into_empty_table(db_path):
+    assert upsert_profile(monthly_budget=150, skip_months=["2025-01"]) is True
+
+    rows = get_all_profiles()
+    assert len(rows) == 1
+    profile = get_current_profile()
+    assert profile["id"] == 1
+    assert profile["name"] == "User"  # schema requires a name; defaulted for a fresh row
+    assert profile["monthly_budget"] == 150.0
+    assert profile["skip_months"] == ["2025-01"]
+
+
+def test_upsert_updates_existing_row_only_for_given_fields(db_path):
+    _insert_profile(id=5, name="Ana", monthly_budget=100.0, theme=2)
+
+    upsert_profile(monthly_budget=250, main_wallet_id=3)
+
+    rows = get_all_profiles()
+    assert len(rows) == 1
+    profile = get_current_profile()
+    assert profile["id"] == 5
+    assert profile["name"] == "Ana"
+    assert profile["theme"] == 2
+    assert profile["monthly_budget"] == 250.0
+    assert profile["main_wallet_id"] == 3
+
+
+def test_upsert_can_rename(db_path):
+    _insert_profile(name="Ana")
+
+    upsert_profile(name="Bea")
+
+    assert [p["name"] for p in map(dict, get_all_profiles())] == ["Bea"]
+
+
+def test_upsert_without_fields_writes_nothing(db_path):
+    assert upsert_profile() is True
+    assert get_all_profiles() == []